@@ -300,19 +300,13 @@ def process_image():
         
         user = request.current_user
         
-        # Validate image first
-        validation_result = image_service.validate_image_file(
+        # Validate and process image into different sizes (single decode)
+        validation_result, processed_images = image_service.validate_and_process(
             file_data=file_data,
             filename=file.filename,
             content_type=file.content_type
         )
         
-        # Process image into different sizes
-        processed_images = image_service.process_image(
-            file_data=file_data,
-            filename=file.filename
-        )
-        
         # Generate base S3 key
         file_ext = file.filename.lower().split('.')[-1] if '.' in file.filename else 'jpg'
         import uuid
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Backfill timeline_bucket on existing posts for photo sharing app
+
+Posts saved before the sharded timeline index was introduced have no
+timeline_bucket attribute and are not in timeline-bucket-index. Run this once
+(and again after changing TIMELINE_SHARDS), then set TIMELINE_INDEX_ENABLED=true
+so the feed reads from the index instead of scanning the posts table.
+"""
+import os
+import sys
+import argparse
+import logging
+
+# Add the parent directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from botocore.exceptions import ClientError
+from shared.dynamodb import db_connection, timeline_bucket_for
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+def backfill_timeline_buckets(dry_run: bool = False) -> dict:
+    """Set timeline_bucket on every post whose bucket is missing or stale"""
+    table = db_connection.get_table('posts')
+    stats = {'scanned': 0, 'updated': 0, 'skipped': 0}
+
+    scan_params = {
+        'ProjectionExpression': 'post_id, timeline_bucket'
+    }
+
+    while True:
+        response = table.scan(**scan_params)
+
+        for item in response['Items']:
+            stats['scanned'] += 1
+            bucket = timeline_bucket_for(item['post_id'])
+            if item.get('timeline_bucket') == bucket:
+                stats['skipped'] += 1
+                continue
+
+            if not dry_run:
+                try:
+                    table.update_item(
+                        Key={'post_id': item['post_id']},
+                        UpdateExpression='SET timeline_bucket = :bucket',
+                        ConditionExpression='attribute_exists(post_id)',
+                        ExpressionAttributeValues={':bucket': bucket}
+                    )
+                except ClientError as e:
+                    # The post was deleted while the backfill was running
+                    if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                        raise
+                    stats['skipped'] += 1
+                    continue
+            stats['updated'] += 1
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return stats
+
+def main():
+    """Backfill timeline buckets"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Count the posts that need a bucket without writing')
+    args = parser.parse_args()
+
+    try:
+        logger.info("Starting timeline bucket backfill...")
+
+        stats = backfill_timeline_buckets(dry_run=args.dry_run)
+
+        logger.info(
+            f"Timeline bucket backfill completed: {stats['scanned']} scanned, "
+            f"{stats['updated']} {'to update' if args.dry_run else 'updated'}, "
+            f"{stats['skipped']} skipped"
+        )
+
+    except Exception as e:
+        logger.error(f"Failed to backfill timeline buckets: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Rewrite legacy comment keys for photo sharing app
+
+Comments used to be stored as comment#{user_id}#{timestamp}; they are now keyed
+comment#{timestamp}#{user_id} so the sort key orders a post's comments by time
+and a limited query returns the oldest ones. This moves every legacy comment to
+the new key, keeping all of its attributes. Comment counts are unchanged.
+"""
+import os
+import sys
+import argparse
+import logging
+
+# Add the parent directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from botocore.exceptions import ClientError
+from shared.dynamodb import db_connection
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+def comment_id(item: dict) -> str:
+    """Current interaction_id for a comment item"""
+    return f"comment#{item['created_at']}#{item['user_id']}"
+
+def migrate_comment(item: dict) -> str:
+    """Move one legacy comment to its time-ordered key; returns 'moved' or 'gone'"""
+    new_item = dict(item, interaction_id=comment_id(item))
+
+    try:
+        db_connection.transact_write_raw([
+            ('Put', 'interactions', {
+                'Item': new_item,
+                'ConditionExpression': 'attribute_not_exists(interaction_id)'
+            }),
+            ('Delete', 'interactions', {
+                'Key': {
+                    'post_id': item['post_id'],
+                    'interaction_id': item['interaction_id']
+                },
+                'ConditionExpression': 'attribute_exists(interaction_id)'
+            })
+        ])
+        return 'moved'
+    except ClientError as e:
+        reasons = e.response.get('CancellationReasons') or []
+        if e.response['Error']['Code'] != 'TransactionCanceledException' or len(reasons) < 2:
+            raise
+        if reasons[1].get('Code') == 'ConditionalCheckFailed':
+            # The legacy comment was deleted in the meantime
+            return 'gone'
+        raise
+
+def migrate_legacy_comments(dry_run: bool = False) -> dict:
+    """Rewrite every comment whose interaction_id does not lead with its timestamp"""
+    table = db_connection.get_table('interactions')
+    stats = {'scanned': 0, 'moved': 0, 'gone': 0}
+
+    scan_params = {
+        'FilterExpression': 'interaction_type = :comment',
+        'ExpressionAttributeValues': {':comment': 'comment'}
+    }
+
+    while True:
+        response = table.scan(**scan_params)
+
+        for item in response['Items']:
+            stats['scanned'] += 1
+            if item['interaction_id'] == comment_id(item):
+                continue
+
+            if dry_run:
+                stats['moved'] += 1
+                continue
+            stats[migrate_comment(item)] += 1
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return stats
+
+def main():
+    """Migrate legacy comments"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Count the legacy comments without writing')
+    args = parser.parse_args()
+
+    try:
+        logger.info("Starting legacy comment migration...")
+
+        stats = migrate_legacy_comments(dry_run=args.dry_run)
+
+        logger.info(
+            f"Legacy comment migration completed: {stats['scanned']} comments scanned, "
+            f"{stats['moved']} {'to move' if args.dry_run else 'moved'}, "
+            f"{stats['gone']} already gone"
+        )
+
+    except Exception as e:
+        logger.error(f"Failed to migrate legacy comments: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
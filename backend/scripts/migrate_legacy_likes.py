@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Rewrite legacy like keys for photo sharing app
+
+Likes used to be stored as like#{user_id}#{timestamp}; they are now keyed
+like#{user_id} so a post holds at most one like per user. This moves every
+legacy like to the new key (keeping its created_at). If the user already has a
+like under the new key, the legacy duplicate is removed and the post's
+likes_count decremented. Once it has run, set LEGACY_LIKE_LOOKUP=false to stop
+the extra legacy lookups in toggle_like and get_user_like.
+"""
+import os
+import sys
+import argparse
+import logging
+
+# Add the parent directory to the path so we can import shared modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from botocore.exceptions import ClientError
+from shared.dynamodb import db_connection
+from shared.models import Interaction
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+def migrate_like(legacy_like: Interaction) -> str:
+    """Move one legacy like to its deterministic key; returns 'moved', 'merged' or 'gone'"""
+    new_item = legacy_like.to_dict()
+    new_item['interaction_id'] = Interaction.like_id(legacy_like.user_id)
+
+    try:
+        db_connection.transact_write_raw([
+            ('Put', 'interactions', {
+                'Item': new_item,
+                'ConditionExpression': 'attribute_not_exists(interaction_id)'
+            }),
+            ('Delete', 'interactions', {
+                'Key': {
+                    'post_id': legacy_like.post_id,
+                    'interaction_id': legacy_like.interaction_id
+                },
+                'ConditionExpression': 'attribute_exists(interaction_id)'
+            })
+        ])
+        return 'moved'
+    except ClientError as e:
+        reasons = e.response.get('CancellationReasons') or []
+        if e.response['Error']['Code'] != 'TransactionCanceledException' or len(reasons) < 2:
+            raise
+        if reasons[1].get('Code') == 'ConditionalCheckFailed':
+            # The legacy like was removed in the meantime
+            return 'gone'
+        if reasons[0].get('Code') == 'ConditionalCheckFailed':
+            # Already liked under the new key: the legacy like was counted twice
+            return 'merged' if legacy_like.delete_with_count() is not None else 'gone'
+        raise
+
+def migrate_legacy_likes(dry_run: bool = False) -> dict:
+    """Rewrite every like whose interaction_id still carries a timestamp"""
+    table = db_connection.get_table('interactions')
+    stats = {'scanned': 0, 'moved': 0, 'merged': 0, 'gone': 0}
+
+    scan_params = {
+        'FilterExpression': 'interaction_type = :like',
+        'ExpressionAttributeValues': {':like': 'like'}
+    }
+
+    while True:
+        response = table.scan(**scan_params)
+
+        for item in response['Items']:
+            stats['scanned'] += 1
+            legacy_like = Interaction._from_item(item)
+            if legacy_like.interaction_id == Interaction.like_id(legacy_like.user_id):
+                continue
+
+            if dry_run:
+                stats['moved'] += 1
+                continue
+            stats[migrate_like(legacy_like)] += 1
+
+        if 'LastEvaluatedKey' not in response:
+            break
+        scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    return stats
+
+def main():
+    """Migrate legacy likes"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Count the legacy likes without writing')
+    args = parser.parse_args()
+
+    try:
+        logger.info("Starting legacy like migration...")
+
+        stats = migrate_legacy_likes(dry_run=args.dry_run)
+
+        logger.info(
+            f"Legacy like migration completed: {stats['scanned']} likes scanned, "
+            f"{stats['moved']} {'to move' if args.dry_run else 'moved'}, "
+            f"{stats['merged']} duplicates removed, {stats['gone']} already gone"
+        )
+
+    except Exception as e:
+        logger.error(f"Failed to migrate legacy likes: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
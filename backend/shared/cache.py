@@ -0,0 +1,93 @@
+"""
+In-process caching utilities
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed time-to-live"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a cached value, or default if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def get_many(self, keys):
+        """Get all cached, unexpired values for the given keys as a dict"""
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = entry[1]
+        return found
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def update(self, key, func):
+        """Replace a cached value with func(value), keeping its expiry; no-op if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return
+            self._data[key] = (entry[0], func(entry[1]))
+
+    def invalidate(self, key):
+        """Drop a single entry"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Public user attributes (username, profile image, bio) shown next to posts
+user_cache = TTLCache(
+    maxsize=int(os.getenv('USER_CACHE_MAXSIZE', '50000')),
+    ttl=float(os.getenv('USER_CACHE_TTL', '300'))
+)
+
+# Full user items by user_id for User.get_by_id (auth and comment lookups hit the same users)
+user_item_cache = TTLCache(
+    maxsize=int(os.getenv('USER_ITEM_CACHE_MAXSIZE', '10000')),
+    ttl=float(os.getenv('USER_ITEM_CACHE_TTL', '60'))
+)
+
+# Post items by post_id; short TTL because like/comment counts change often
+post_cache = TTLCache(
+    maxsize=int(os.getenv('POST_CACHE_MAXSIZE', '10000')),
+    ttl=float(os.getenv('POST_CACHE_TTL', '30'))
+)
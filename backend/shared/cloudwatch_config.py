@@ -10,6 +10,7 @@ import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from functools import wraps
+from contextlib import contextmanager
 
 logger = logging.getLogger(__name__)
 
@@ -600,4 +601,18 @@ def monitor_database_operation(operation: str, table_name: str):
                 raise
         
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
+
+@contextmanager
+def monitor_database_block(operation: str, table_name: str):
+    """データベース操作監視コンテキストマネージャ（ホットパス用、関数のネストが不要）"""
+    start_time = time.time()
+    success = True
+    try:
+        yield
+    except Exception:
+        success = False
+        raise
+    finally:
+        duration_ms = (time.time() - start_time) * 1000
+        cloudwatch_config.record_database_operation(operation, table_name, duration_ms, success)
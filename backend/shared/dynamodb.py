@@ -3,16 +3,336 @@ DynamoDB connection and configuration utilities
 """
 import boto3
 import os
+import re
+import zlib
+from enum import Enum
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+from botocore.config import Config
 from botocore.exceptions import ClientError
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Check if the DAX client is available
+try:
+    from amazondax import AmazonDaxClient
+    DAX_AVAILABLE = True
+except ImportError:
+    DAX_AVAILABLE = False
+
+# Check if orjson is available (faster parsing of DynamoDB's JSON responses)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+class TableType(str, Enum):
+    """Logical table types accepted by DynamoDBConnection.get_table"""
+    USERS = 'users'
+    POSTS = 'posts'
+    INTERACTIONS = 'interactions'
+
+# Adaptive retry mode adds client-side rate limiting on top of backoff when throttled.
+# The default pool of 10 connections is too small once request threads, the lookup
+# executor and parallel batch reads share the one client; keep idle connections alive.
+DYNAMODB_CLIENT_CONFIG = Config(
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    max_pool_connections=int(os.getenv('DYNAMODB_MAX_POOL_CONNECTIONS', '128')),
+    tcp_keepalive=True
+)
+
+# Health probes fail fast instead of inheriting the data path's retries and 60s socket
+# timeouts, so a stuck probe ends within its check timeout and frees its worker thread
+PROBE_CLIENT_CONFIG = Config(
+    connect_timeout=2,
+    read_timeout=2,
+    retries={'mode': 'standard', 'total_max_attempts': 1}
+)
+
+# botocore releases whose private BaseJSONParser._parse_body_as_json(self, body_contents)
+# the orjson parser below has been checked against (requirements.txt pins 1.31 via boto3)
+ORJSON_PARSER_BOTOCORE_VERSIONS = ((1, 31), (2, 0))
+
+# orjson turns integers outside 64 bits into floats instead of failing; any such integer
+# has 19+ digits, so bodies containing a run that long are left to the stock parser
+_LONG_DIGIT_RUN = re.compile(rb'\d{19}')
+
+def install_orjson_response_parser() -> bool:
+    """
+    Parse botocore JSON-protocol response bodies with orjson
+    
+    This replaces a private botocore method for every JSON-protocol client in the process
+    (DynamoDB, CloudWatch Logs, ...), so it is opt-in via BOTOCORE_ORJSON=true and skipped
+    on botocore versions outside ORJSON_PARSER_BOTOCORE_VERSIONS. Returns True if installed.
+    """
+    if not ORJSON_AVAILABLE:
+        return False
+    
+    import botocore
+    from botocore import parsers
+    
+    try:
+        version = tuple(int(part) for part in botocore.__version__.split('.')[:2])
+    except ValueError:
+        version = None
+    lowest, below = ORJSON_PARSER_BOTOCORE_VERSIONS
+    stock_parse = getattr(parsers.BaseJSONParser, '_parse_body_as_json', None)
+    if version is None or not lowest <= version < below or stock_parse is None:
+        logger.warning(f"orjson response parser not installed: unsupported botocore {botocore.__version__}")
+        return False
+    if getattr(stock_parse, 'uses_orjson', False):
+        return True
+    
+    def _parse_body_as_json(self, body_contents):
+        if not body_contents or _LONG_DIGIT_RUN.search(body_contents):
+            return stock_parse(self, body_contents)
+        try:
+            return orjson.loads(body_contents)
+        except orjson.JSONDecodeError:
+            # Bodies orjson rejects (non-JSON errors, 1e400, lone surrogates) keep stock handling
+            return stock_parse(self, body_contents)
+    
+    _parse_body_as_json.uses_orjson = True
+    parsers.BaseJSONParser._parse_body_as_json = _parse_body_as_json
+    return True
+
+if os.getenv('BOTOCORE_ORJSON', 'false').lower() == 'true':
+    install_orjson_response_parser()
+
+@lru_cache(maxsize=None)
+def get_session():
+    """Get the process-wide boto3 session (credentials are resolved once)"""
+    return boto3.session.Session()
+
+# Sharded feed index (timeline_bucket + created_at). It is a new index rather than a
+# change to the old timeline-index (timeline_pk), because a GSI's keys and projection
+# cannot be updated in place; timeline-index is dropped in a later deploy.
+TIMELINE_INDEX = 'timeline-bucket-index'
+
+# Posts are spread over a small, fixed set of timeline partitions so that writes for
+# the current timestamp do not all land on one hot partition.
+# Changing TIMELINE_SHARDS moves posts to different buckets: posts written under the
+# old count are orphaned (missed or read twice by the feed) until every post's
+# timeline_bucket is rewritten with timeline_bucket_for().
+TIMELINE_SHARDS = int(os.getenv('TIMELINE_SHARDS', '4'))
+TIMELINE_BUCKETS = tuple(f"TIMELINE#{shard}" for shard in range(TIMELINE_SHARDS))
+
+# Non-key post attributes projected into the timeline index (what a feed renders)
+TIMELINE_PROJECTED_ATTRIBUTES = ['user_id', 'image_key', 'caption', 'likes_count', 'comments_count']
+
+def timeline_bucket_for(post_id):
+    """Get the timeline index partition for a post (stable across processes)"""
+    return TIMELINE_BUCKETS[zlib.crc32(post_id.encode('utf-8')) % TIMELINE_SHARDS]
+
+# Table schemas are built once at import; create_table() does not mutate them
+_USERS_SCHEMA = {
+    'KeySchema': [
+        {
+            'AttributeName': 'user_id',
+            'KeyType': 'HASH'
+        }
+    ],
+    'AttributeDefinitions': [
+        {
+            'AttributeName': 'user_id',
+            'AttributeType': 'S'
+        },
+        {
+            'AttributeName': 'username',
+            'AttributeType': 'S'
+        },
+        {
+            'AttributeName': 'email',
+            'AttributeType': 'S'
+        }
+    ],
+    'GlobalSecondaryIndexes': [
+        {
+            'IndexName': 'username-index',
+            'KeySchema': [
+                {
+                    'AttributeName': 'username',
+                    'KeyType': 'HASH'
+                }
+            ],
+            'Projection': {
+                'ProjectionType': 'ALL'
+            },
+            'ProvisionedThroughput': {
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        },
+        {
+            'IndexName': 'email-index',
+            'KeySchema': [
+                {
+                    'AttributeName': 'email',
+                    'KeyType': 'HASH'
+                }
+            ],
+            'Projection': {
+                'ProjectionType': 'ALL'
+            },
+            'ProvisionedThroughput': {
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        }
+    ],
+    'ProvisionedThroughput': {
+        'ReadCapacityUnits': 5,
+        'WriteCapacityUnits': 5
+    }
+}
+
+_POSTS_SCHEMA = {
+    'KeySchema': [
+        {
+            'AttributeName': 'post_id',
+            'KeyType': 'HASH'
+        }
+    ],
+    'AttributeDefinitions': [
+        {
+            'AttributeName': 'post_id',
+            'AttributeType': 'S'
+        },
+        {
+            'AttributeName': 'user_id',
+            'AttributeType': 'S'
+        },
+        {
+            'AttributeName': 'created_at',
+            'AttributeType': 'S'
+        },
+        {
+            'AttributeName': 'timeline_bucket',
+            'AttributeType': 'S'
+        }
+    ],
+    'GlobalSecondaryIndexes': [
+        {
+            'IndexName': 'user-posts-index',
+            'KeySchema': [
+                {
+                    'AttributeName': 'user_id',
+                    'KeyType': 'HASH'
+                },
+                {
+                    'AttributeName': 'created_at',
+                    'KeyType': 'RANGE'
+                }
+            ],
+            'Projection': {
+                'ProjectionType': 'ALL'
+            },
+            'ProvisionedThroughput': {
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        },
+        {
+            'IndexName': TIMELINE_INDEX,
+            'KeySchema': [
+                {
+                    'AttributeName': 'timeline_bucket',
+                    'KeyType': 'HASH'
+                },
+                {
+                    'AttributeName': 'created_at',
+                    'KeyType': 'RANGE'
+                }
+            ],
+            'Projection': {
+                'ProjectionType': 'INCLUDE',
+                'NonKeyAttributes': TIMELINE_PROJECTED_ATTRIBUTES
+            },
+            'ProvisionedThroughput': {
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        }
+    ],
+    'ProvisionedThroughput': {
+        'ReadCapacityUnits': 5,
+        'WriteCapacityUnits': 5
+    }
+}
+
+_INTERACTIONS_SCHEMA = {
+    'KeySchema': [
+        {
+            'AttributeName': 'post_id',
+            'KeyType': 'HASH'
+        },
+        {
+            'AttributeName': 'interaction_id',
+            'KeyType': 'RANGE'
+        }
+    ],
+    'AttributeDefinitions': [
+        {
+            'AttributeName': 'post_id',
+            'AttributeType': 'S'
+        },
+        {
+            'AttributeName': 'interaction_id',
+            'AttributeType': 'S'
+        },
+        {
+            'AttributeName': 'user_id',
+            'AttributeType': 'S'
+        },
+        {
+            'AttributeName': 'interaction_type',
+            'AttributeType': 'S'
+        }
+    ],
+    'GlobalSecondaryIndexes': [
+        {
+            'IndexName': 'user-interactions-index',
+            'KeySchema': [
+                {
+                    'AttributeName': 'user_id',
+                    'KeyType': 'HASH'
+                },
+                {
+                    'AttributeName': 'interaction_type',
+                    'KeyType': 'RANGE'
+                }
+            ],
+            'Projection': {
+                'ProjectionType': 'ALL'
+            },
+            'ProvisionedThroughput': {
+                'ReadCapacityUnits': 5,
+                'WriteCapacityUnits': 5
+            }
+        }
+    ],
+    'ProvisionedThroughput': {
+        'ReadCapacityUnits': 5,
+        'WriteCapacityUnits': 5
+    }
+}
+
 class DynamoDBConnection:
     """DynamoDB connection manager"""
     
     def __init__(self):
-        self.dynamodb = None
+        self.dynamodb = None          # Data plane (DAX when configured)
+        self.control_dynamodb = None  # Control plane (DDL, DescribeTable, ListTables)
+        self.client = None
+        self._probe_client = None
+        self._connect_kwargs = {}
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
+        self._existing_tables = None
+        self._tables = {}
         self.table_names = {
             'users': os.getenv('USERS_TABLE', 'Users'),
             'posts': os.getenv('POSTS_TABLE', 'Posts'),
@@ -26,59 +346,159 @@ class DynamoDBConnection:
             # Check if running in local development environment
             if os.getenv('ENVIRONMENT') == 'local':
                 # Connect to DynamoDB Local
-                self.dynamodb = boto3.resource(
+                self._connect_kwargs = {
+                    'endpoint_url': 'http://localhost:8000',
+                    'region_name': 'us-east-1',
+                    'aws_access_key_id': 'dummy',
+                    'aws_secret_access_key': 'dummy'
+                }
+                self.control_dynamodb = get_session().resource(
                     'dynamodb',
-                    endpoint_url='http://localhost:8000',
-                    region_name='us-east-1',
-                    aws_access_key_id='dummy',
-                    aws_secret_access_key='dummy'
+                    config=DYNAMODB_CLIENT_CONFIG,
+                    **self._connect_kwargs
                 )
                 logger.info("Connected to DynamoDB Local")
             else:
                 # Connect to AWS DynamoDB
-                self.dynamodb = boto3.resource('dynamodb')
+                self.control_dynamodb = get_session().resource('dynamodb', config=DYNAMODB_CLIENT_CONFIG)
                 logger.info("Connected to AWS DynamoDB")
+            
+            self.dynamodb = self.control_dynamodb
+            
+            # Route reads/writes through DAX when a cluster endpoint is configured.
+            # DAX does not serve control-plane calls, so DDL stays on DynamoDB.
+            dax_endpoint = os.getenv('DAX_ENDPOINT')
+            if dax_endpoint:
+                if DAX_AVAILABLE:
+                    self.dynamodb = AmazonDaxClient.resource(
+                        endpoint_url=dax_endpoint,
+                        region_name=self.control_dynamodb.meta.client.meta.region_name
+                    )
+                    logger.info(f"Connected to DAX cluster: {dax_endpoint}")
+                else:
+                    logger.warning("DAX_ENDPOINT is set but amazon-dax-client is not installed; using DynamoDB directly")
+            
+            # Low-level client for hot read/write paths (skips the Resource layer)
+            self.client = self.dynamodb.meta.client
+            
+            # Table handles are cheap, local objects; build them once per connection
+            self._tables = {
+                table_type: self.dynamodb.Table(self.table_names[table_type.value])
+                for table_type in TableType
+            }
         except Exception as e:
             logger.error(f"Failed to initialize DynamoDB connection: {e}")
             raise
     
+    def get_probe_client(self):
+        """Get a DynamoDB client with short timeouts and no retries for health checks (built on first use)"""
+        if self._probe_client is None:
+            self._probe_client = get_session().client(
+                'dynamodb',
+                config=PROBE_CLIENT_CONFIG,
+                **self._connect_kwargs
+            )
+        return self._probe_client
+    
     def get_table(self, table_type):
         """Get DynamoDB table by type"""
-        if table_type not in self.table_names:
-            raise ValueError(f"Unknown table type: {table_type}")
-        
-        table_name = self.table_names[table_type]
         try:
-            table = self.dynamodb.Table(table_name)
-            # Test table accessibility
-            table.load()
-            return table
-        except ClientError as e:
-            logger.error(f"Failed to access table {table_name}: {e}")
-            raise
+            return self._tables[table_type]
+        except KeyError:
+            raise ValueError(f"Unknown table type: {table_type}") from None
+    
+    def serialize_item(self, item):
+        """Convert a Python dict into DynamoDB AttributeValue format"""
+        return {k: self._serializer.serialize(v) for k, v in item.items()}
+    
+    def deserialize_item(self, item):
+        """Convert a DynamoDB AttributeValue dict into plain Python values"""
+        return {k: self._deserializer.deserialize(v) for k, v in item.items()}
+    
+    def get_item_raw(self, table_type, key, **kwargs):
+        """Get a single item through the low-level client"""
+        response = self.client.get_item(
+            TableName=self.table_names[table_type],
+            Key=self.serialize_item(key),
+            **kwargs
+        )
+        item = response.get('Item')
+        return self.deserialize_item(item) if item else None
+    
+    def put_item_raw(self, table_type, item, **kwargs):
+        """Put a single item through the low-level client"""
+        return self.client.put_item(
+            TableName=self.table_names[table_type],
+            Item=self.serialize_item(item),
+            **kwargs
+        )
+    
+    def query_raw(self, table_type, **kwargs):
+        """Query through the low-level client, returning deserialized items"""
+        if 'ExpressionAttributeValues' in kwargs:
+            kwargs['ExpressionAttributeValues'] = self.serialize_item(kwargs['ExpressionAttributeValues'])
+        if 'ExclusiveStartKey' in kwargs:
+            kwargs['ExclusiveStartKey'] = self.serialize_item(kwargs['ExclusiveStartKey'])
+        
+        response = self.client.query(TableName=self.table_names[table_type], **kwargs)
+        
+        result = {'Items': [self.deserialize_item(item) for item in response['Items']]}
+        if 'LastEvaluatedKey' in response:
+            result['LastEvaluatedKey'] = self.deserialize_item(response['LastEvaluatedKey'])
+        return result
+    
+    def scan_raw(self, table_type, **kwargs):
+        """Scan through the low-level client, returning deserialized items"""
+        if 'ExpressionAttributeValues' in kwargs:
+            kwargs['ExpressionAttributeValues'] = self.serialize_item(kwargs['ExpressionAttributeValues'])
+        if 'ExclusiveStartKey' in kwargs:
+            kwargs['ExclusiveStartKey'] = self.serialize_item(kwargs['ExclusiveStartKey'])
+        
+        response = self.client.scan(TableName=self.table_names[table_type], **kwargs)
+        
+        result = {'Items': [self.deserialize_item(item) for item in response['Items']]}
+        if 'LastEvaluatedKey' in response:
+            result['LastEvaluatedKey'] = self.deserialize_item(response['LastEvaluatedKey'])
+        return result
+    
+    def transact_write_raw(self, operations):
+        """Run (action, table_type, params) writes atomically as one TransactWriteItems call"""
+        transact_items = []
+        for action, table_type, params in operations:
+            params = dict(params, TableName=self.table_names[table_type])
+            for field in ('Item', 'Key', 'ExpressionAttributeValues'):
+                if field in params:
+                    params[field] = self.serialize_item(params[field])
+            transact_items.append({action: params})
+        
+        return self.client.transact_write_items(TransactItems=transact_items)
     
     def create_tables(self):
         """Create all required tables if they don't exist"""
-        tables_created = []
+        pending = {}
         
         try:
+            # One ListTables round trip instead of a DescribeTable per table
+            existing = self._list_table_names(refresh=True)
+            
             # Create Users table
-            if not self._table_exists(self.table_names['users']):
-                self._create_users_table()
-                tables_created.append('Users')
+            if self.table_names['users'] not in existing:
+                pending['Users'] = self._create_users_table()
             
             # Create Posts table
-            if not self._table_exists(self.table_names['posts']):
-                self._create_posts_table()
-                tables_created.append('Posts')
+            if self.table_names['posts'] not in existing:
+                pending['Posts'] = self._create_posts_table()
             
             # Create Interactions table
-            if not self._table_exists(self.table_names['interactions']):
-                self._create_interactions_table()
-                tables_created.append('Interactions')
+            if self.table_names['interactions'] not in existing:
+                pending['Interactions'] = self._create_interactions_table()
+            
+            # Wait for all new tables together instead of one after another
+            self._wait_for_tables(list(pending.values()))
+            existing.update(self.table_names[t] for t in ('users', 'posts', 'interactions'))
             
-            if tables_created:
-                logger.info(f"Created tables: {', '.join(tables_created)}")
+            if pending:
+                logger.info(f"Created tables: {', '.join(pending)}")
             else:
                 logger.info("All tables already exist")
                 
@@ -86,220 +506,62 @@ class DynamoDBConnection:
             logger.error(f"Failed to create tables: {e}")
             raise
     
+    def _wait_for_tables(self, table_names):
+        """Wait until the given tables are ACTIVE, polling them concurrently"""
+        if not table_names:
+            return
+        
+        # The default waiter polls every 20 seconds; tables usually become
+        # active within a few seconds (almost immediately on DynamoDB Local)
+        delay = 1 if os.getenv('ENVIRONMENT') == 'local' else 2
+        waiter_config = {'Delay': delay, 'MaxAttempts': 30}
+        waiter = self.control_dynamodb.meta.client.get_waiter('table_exists')
+        
+        def wait(table_name):
+            waiter.wait(TableName=table_name, WaiterConfig=waiter_config)
+            logger.info(f"Table {table_name} created successfully")
+        
+        with ThreadPoolExecutor(max_workers=len(table_names)) as executor:
+            # list() re-raises the first waiter failure, if any
+            list(executor.map(wait, table_names))
+    
+    def _list_table_names(self, refresh=False):
+        """Get the set of existing table names (cached after first call)"""
+        if self._existing_tables is None or refresh:
+            existing = set()
+            paginator = self.control_dynamodb.meta.client.get_paginator('list_tables')
+            for page in paginator.paginate():
+                existing.update(page['TableNames'])
+            self._existing_tables = existing
+        return self._existing_tables
+    
     def _table_exists(self, table_name):
         """Check if table exists"""
-        try:
-            table = self.dynamodb.Table(table_name)
-            table.load()
-            return True
-        except ClientError as e:
-            if e.response['Error']['Code'] == 'ResourceNotFoundException':
-                return False
-            raise
+        return table_name in self._list_table_names()
     
     def _create_users_table(self):
         """Create Users table"""
-        table = self.dynamodb.create_table(
+        self.control_dynamodb.create_table(
             TableName=self.table_names['users'],
-            KeySchema=[
-                {
-                    'AttributeName': 'user_id',
-                    'KeyType': 'HASH'
-                }
-            ],
-            AttributeDefinitions=[
-                {
-                    'AttributeName': 'user_id',
-                    'AttributeType': 'S'
-                },
-                {
-                    'AttributeName': 'username',
-                    'AttributeType': 'S'
-                },
-                {
-                    'AttributeName': 'email',
-                    'AttributeType': 'S'
-                }
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'username-index',
-                    'KeySchema': [
-                        {
-                            'AttributeName': 'username',
-                            'KeyType': 'HASH'
-                        }
-                    ],
-                    'Projection': {
-                        'ProjectionType': 'ALL'
-                    },
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                },
-                {
-                    'IndexName': 'email-index',
-                    'KeySchema': [
-                        {
-                            'AttributeName': 'email',
-                            'KeyType': 'HASH'
-                        }
-                    ],
-                    'Projection': {
-                        'ProjectionType': 'ALL'
-                    },
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                }
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
+            **_USERS_SCHEMA
         )
-        
-        # Wait for table to be created
-        table.wait_until_exists()
-        logger.info("Users table created successfully")
+        return self.table_names['users']
     
     def _create_posts_table(self):
         """Create Posts table"""
-        table = self.dynamodb.create_table(
+        self.control_dynamodb.create_table(
             TableName=self.table_names['posts'],
-            KeySchema=[
-                {
-                    'AttributeName': 'post_id',
-                    'KeyType': 'HASH'
-                }
-            ],
-            AttributeDefinitions=[
-                {
-                    'AttributeName': 'post_id',
-                    'AttributeType': 'S'
-                },
-                {
-                    'AttributeName': 'user_id',
-                    'AttributeType': 'S'
-                },
-                {
-                    'AttributeName': 'created_at',
-                    'AttributeType': 'S'
-                }
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'user-posts-index',
-                    'KeySchema': [
-                        {
-                            'AttributeName': 'user_id',
-                            'KeyType': 'HASH'
-                        },
-                        {
-                            'AttributeName': 'created_at',
-                            'KeyType': 'RANGE'
-                        }
-                    ],
-                    'Projection': {
-                        'ProjectionType': 'ALL'
-                    },
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                },
-                {
-                    'IndexName': 'timeline-index',
-                    'KeySchema': [
-                        {
-                            'AttributeName': 'created_at',
-                            'KeyType': 'HASH'
-                        }
-                    ],
-                    'Projection': {
-                        'ProjectionType': 'ALL'
-                    },
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                }
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
+            **_POSTS_SCHEMA
         )
-        
-        # Wait for table to be created
-        table.wait_until_exists()
-        logger.info("Posts table created successfully")
+        return self.table_names['posts']
     
     def _create_interactions_table(self):
         """Create Interactions table"""
-        table = self.dynamodb.create_table(
+        self.control_dynamodb.create_table(
             TableName=self.table_names['interactions'],
-            KeySchema=[
-                {
-                    'AttributeName': 'post_id',
-                    'KeyType': 'HASH'
-                },
-                {
-                    'AttributeName': 'interaction_id',
-                    'KeyType': 'RANGE'
-                }
-            ],
-            AttributeDefinitions=[
-                {
-                    'AttributeName': 'post_id',
-                    'AttributeType': 'S'
-                },
-                {
-                    'AttributeName': 'interaction_id',
-                    'AttributeType': 'S'
-                },
-                {
-                    'AttributeName': 'user_id',
-                    'AttributeType': 'S'
-                },
-                {
-                    'AttributeName': 'interaction_type',
-                    'AttributeType': 'S'
-                }
-            ],
-            GlobalSecondaryIndexes=[
-                {
-                    'IndexName': 'user-interactions-index',
-                    'KeySchema': [
-                        {
-                            'AttributeName': 'user_id',
-                            'KeyType': 'HASH'
-                        },
-                        {
-                            'AttributeName': 'interaction_type',
-                            'KeyType': 'RANGE'
-                        }
-                    ],
-                    'Projection': {
-                        'ProjectionType': 'ALL'
-                    },
-                    'ProvisionedThroughput': {
-                        'ReadCapacityUnits': 5,
-                        'WriteCapacityUnits': 5
-                    }
-                }
-            ],
-            ProvisionedThroughput={
-                'ReadCapacityUnits': 5,
-                'WriteCapacityUnits': 5
-            }
+            **_INTERACTIONS_SCHEMA
         )
-        
-        # Wait for table to be created
-        table.wait_until_exists()
-        logger.info("Interactions table created successfully")
+        return self.table_names['interactions']
 
 
 # Global connection instance
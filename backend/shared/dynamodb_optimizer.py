@@ -3,60 +3,182 @@ DynamoDB クエリ最適化とパフォーマンス監視
 要件6.4: DynamoDBクエリ最適化とインデックス調整
 """
 
+import os
+import sys
+import math
+import random
 import time
+import threading
 import json
-from typing import Dict, Any, List, Optional, Tuple
+import heapq
+from itertools import islice
+from operator import itemgetter
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from botocore.exceptions import ClientError
 from .logging_config import get_logger
-from .dynamodb import db_connection
+from .dynamodb import db_connection, TIMELINE_INDEX, TIMELINE_BUCKETS, TIMELINE_PROJECTED_ATTRIBUTES
+from .cache import user_cache, post_cache
 from .monitoring import monitor_database_operation
+from .cloudwatch_config import monitor_database_block
 
 logger = get_logger(__name__)
 
+# HdrHistogram が利用可能な場合はレイテンシ分布（パーセンタイル）も記録
+try:
+    from hdrh.histogram import HdrHistogram
+    HDR_AVAILABLE = True
+except ImportError:
+    logger.warning("hdrhistogram not available. Query latency percentiles will not be recorded.")
+    HDR_AVAILABLE = False
+
+# ヒストグラムの記録範囲（マイクロ秒、1µs〜60秒、有効桁数3）
+_HIST_MAX_MICROS = 60_000_000
+
+# クエリ種別（メトリクスのキー）。intern 済みの同一オブジェクトを使い回す
+QT_TIMELINE = sys.intern('timeline_query')
+QT_TIMELINE_SCAN = sys.intern('timeline_scan_fallback')
+QT_USER_POSTS = sys.intern('user_posts_query')
+QT_INTERACTIONS = sys.intern('interactions_query')
+QT_BATCH_GET_USERS = sys.intern('batch_get_users')
+QT_POSTS_WITH_USER_INFO = sys.intern('posts_with_user_info')
+QT_CONDITIONAL_UPDATE = sys.intern('conditional_update')
+QUERY_TYPES = (
+    QT_TIMELINE, QT_TIMELINE_SCAN, QT_USER_POSTS, QT_INTERACTIONS,
+    QT_BATCH_GET_USERS, QT_POSTS_WITH_USER_INFO, QT_CONDITIONAL_UPDATE
+)
+
+# 投稿の表示に必要なユーザー属性
+USER_SUMMARY_PROJECTION = 'user_id, username, profile_image, bio'
+
+# 投稿一覧の表示に必要な投稿属性
+POST_SUMMARY_PROJECTION = 'post_id, user_id, image_key, caption, likes_count, comments_count, created_at'
+
+# クエリごとに変わらないパラメータ（呼び出し時は値を持つ項目のみ追加する）
+_TIMELINE_QUERY = MappingProxyType({
+    'IndexName': TIMELINE_INDEX,
+    'KeyConditionExpression': 'timeline_bucket = :bucket',
+    'ScanIndexForward': False,  # 最新順でソート
+    # 表示に必要な属性のみ取得（転送量と RCU を削減）
+    'ProjectionExpression': POST_SUMMARY_PROJECTION
+})
+_USER_POSTS_QUERY = MappingProxyType({
+    'IndexName': 'user-posts-index',
+    'KeyConditionExpression': 'user_id = :user_id',
+    'ScanIndexForward': False,  # 最新順
+    'ProjectionExpression': POST_SUMMARY_PROJECTION
+})
+_INTERACTIONS_QUERY = MappingProxyType({
+    'KeyConditionExpression': 'post_id = :post_id',
+    'ScanIndexForward': False  # 最新順
+})
+# 条件演算子 → 条件式の組み立て（n: 属性名プレースホルダ, v: 値プレースホルダ）
+_COND_FMTS = {
+    'exists': lambda n, v: f"attribute_exists({n})",
+    'not_exists': lambda n, v: f"attribute_not_exists({n})",
+    'eq': lambda n, v: f"{n} = {v}",
+    'ne': lambda n, v: f"{n} <> {v}",
+    'gt': lambda n, v: f"{n} > {v}",
+    'lt': lambda n, v: f"{n} < {v}",
+}
+
+# 値を参照しない条件演算子（未使用の値を送ると DynamoDB がエラーにする）
+_VALUELESS_CONDS = frozenset(('exists', 'not_exists'))
+
+# interaction_id は '{type}#...' 形式（いいねは 'like#{user_id}'、コメントは 'comment#{created_at}#{user_id}'）のため、'~' を上限にした範囲で種別を絞り込む
+_INTERACTIONS_BY_TYPE_QUERY = MappingProxyType({
+    'KeyConditionExpression': 'post_id = :post_id AND interaction_id BETWEEN :type_lo AND :type_hi',
+    'ScanIndexForward': False
+})
+
 class DynamoDBOptimizer:
     """DynamoDB クエリ最適化とパフォーマンス監視クラス"""
     
     def __init__(self):
         self.db = db_connection
-        self.query_metrics = {}
+        # テーブルハンドルは初期化時に一度だけ解決
+        self._posts = self.db.get_table('posts')
+        self._users = self.db.get_table('users')
+        self._interactions = self.db.get_table('interactions')
+        self.user_cache = user_cache  # user_id -> USER_SUMMARY_PROJECTION の属性
+        self.post_cache = post_cache  # post_id -> 投稿アイテム（ユーザー情報は含まない）
+        # クエリ種別ごとのメトリクス（種別→列インデックス、各統計値は並列リスト）
+        self._metrics_lock = threading.Lock()
+        self._qt_index = {}
+        self._qt_names = []
+        self._total_queries = []
+        self._total_time = []
+        self._total_items = []
+        self._slow_queries = []
+        self._max_time = []
+        self._min_time = []
+        self._histograms = []
         self.slow_query_threshold = 1.0  # 1秒以上のクエリを遅いクエリとして記録
+        self.batch_get_max_workers = 8  # BatchGetItem の同時実行数
+        self.batch_get_max_retries = 10  # UnprocessedKeys の再試行回数
+        self.overfetch_ratio = 1.25  # タイムラインで limit に対して読み込む件数の倍率
+        # フォールバックスキャンの並列セグメント数（1 の場合は従来の逐次スキャン）
+        self.fallback_scan_segments = int(os.getenv('TIMELINE_SCAN_SEGMENTS', '1'))
+        # 既存の投稿に timeline_bucket を付与するまで（scripts/backfill_timeline_buckets.py）
+        # インデックスには新しい投稿しか含まれないため、有効化されるまではスキャンで取得する
+        self.timeline_index_enabled = os.getenv('TIMELINE_INDEX_ENABLED', 'false').lower() == 'true'
     
-    def optimize_timeline_query(self, limit: int = 20, last_key: Dict[str, str] = None) -> Dict[str, Any]:
+    def optimize_timeline_query(self, limit: int = 20, last_key: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         タイムライン取得クエリの最適化
-        GSI (Global Secondary Index) を使用してスキャンを回避
+        GSI 'timeline-bucket-index'（timeline_bucket + created_at）を使用してスキャンを回避
+        投稿はホットパーティションを避けるため複数バケットに分散しているので、
+        バケットごとにクエリして created_at 降順でマージする
+        last_key はバケットごとのカーソル（None は読み切り済み）
+        TIMELINE_INDEX_ENABLED が無効の場合はスキャン方式で取得する
         """
-        @monitor_database_operation('timeline_query_optimized', 'posts')
-        def _optimized_timeline_query():
+        if not self.timeline_index_enabled:
+            return self._fallback_timeline_scan(limit, last_key)
+        
+        with monitor_database_block('timeline_query_optimized', 'posts'):
             start_time = time.time()
             
             try:
-                table = self.db.get_table('posts')
-                
-                # GSI 'timeline-index' を使用（created_at をソートキーとして使用）
-                # 実際の実装では、すべての投稿に共通のパーティションキー（例：'TIMELINE'）を追加
-                query_params = {
-                    'IndexName': 'timeline-index',
-                    'KeyConditionExpression': 'timeline_pk = :timeline_pk',
-                    'ExpressionAttributeValues': {':timeline_pk': 'TIMELINE'},
-                    'ScanIndexForward': False,  # 最新順でソート
-                    'Limit': limit
-                }
-                
-                if last_key:
-                    query_params['ExclusiveStartKey'] = last_key
+                cursors = last_key or {}
+                pages = {}
+                
+                # 読み切り済みのバケットは除外
+                active_buckets = [
+                    bucket for bucket in TIMELINE_BUCKETS
+                    if not (bucket in cursors and cursors[bucket] is None)
+                ]
+                
+                # 投稿はバケットに均等に分散するため、各バケットから limit 件ずつではなく
+                # 合計 limit * overfetch_ratio 件程度を読み込む
+                bucket_limit = limit
+                if active_buckets:
+                    bucket_limit = min(limit, math.ceil(limit * self.overfetch_ratio / len(active_buckets)))
+                
+                for bucket in active_buckets:
+                    query_params = {
+                        **_TIMELINE_QUERY,
+                        'ExpressionAttributeValues': {':bucket': bucket},
+                        'Limit': bucket_limit
+                    }
+                    
+                    if cursors.get(bucket):
+                        query_params['ExclusiveStartKey'] = cursors[bucket]
+                    
+                    # 低レベルクライアント経由（Resource 層の変換を省略）
+                    pages[bucket] = self.db.query_raw('posts', **query_params)
                 
-                response = table.query(**query_params)
+                items, next_cursors = self._merge_timeline_pages(pages, cursors, limit)
                 
                 # クエリ時間を記録
                 query_time = time.time() - start_time
-                self._record_query_metrics('timeline_query', query_time, len(response['Items']))
+                self._record_query_metrics(QT_TIMELINE, query_time, len(items))
                 
                 return {
-                    'posts': response['Items'],
-                    'last_evaluated_key': response.get('LastEvaluatedKey'),
-                    'has_more': 'LastEvaluatedKey' in response,
+                    'posts': items,
+                    'last_evaluated_key': next_cursors,
+                    'has_more': next_cursors is not None,
                     'query_time': query_time
                 }
                 
@@ -64,34 +186,72 @@ class DynamoDBOptimizer:
                 logger.error(f"Optimized timeline query failed: {e}")
                 # フォールバック：従来のスキャン方式
                 return self._fallback_timeline_scan(limit, last_key)
+    
+    def _merge_timeline_pages(self, pages: Dict[str, Dict[str, Any]], cursors: Dict[str, Any],
+                              limit: int) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """バケットごとのクエリ結果を created_at 降順でマージし、次ページのカーソルを作成"""
+        streams = [[(item, bucket) for item in page['Items']] for bucket, page in pages.items()]
+        merged = heapq.merge(*streams, key=lambda pair: pair[0]['created_at'], reverse=True)
         
-        return _optimized_timeline_query()
+        items = []
+        consumed = {}
+        last_items = {}
+        for item, bucket in islice(merged, limit):
+            items.append(item)
+            consumed[bucket] = consumed.get(bucket, 0) + 1
+            last_items[bucket] = item
+            
+            # 続きがあるバケットの取得分を使い切ったらここで打ち切る
+            # （未取得の続きの方が他バケットの残りより新しい可能性があるため）
+            page = pages[bucket]
+            if consumed[bucket] == len(page['Items']) and page.get('LastEvaluatedKey'):
+                break
+        
+        next_cursors = dict(cursors)
+        for bucket, page in pages.items():
+            count = consumed.get(bucket, 0)
+            if count == len(page['Items']):
+                # ページを使い切った場合は DynamoDB のキーをそのまま使用（なければ読み切り）
+                next_cursors[bucket] = page.get('LastEvaluatedKey')
+            elif count:
+                item = last_items[bucket]
+                next_cursors[bucket] = {
+                    'post_id': item['post_id'],
+                    'timeline_bucket': bucket,
+                    'created_at': item['created_at']
+                }
+            # 1件も使わなかったバケットは前回のカーソルを維持
+        
+        if all(next_cursors.get(bucket, {}) is None for bucket in TIMELINE_BUCKETS):
+            return items, None
+        return items, next_cursors
     
     def _fallback_timeline_scan(self, limit: int, last_key: Dict[str, str] = None) -> Dict[str, Any]:
         """タイムライン取得のフォールバック（スキャン方式）"""
         start_time = time.time()
         
+        if self.fallback_scan_segments > 1:
+            return self._parallel_timeline_scan(limit, last_key, start_time)
+        
         try:
-            table = self.db.get_table('posts')
-            
+            # 読み込んだ項目はすべて返す（LastEvaluatedKey は読み込んだ最後の項目の次を指すため、
+            # 多めに読んで一部を捨てると捨てた投稿がどのページにも表示されなくなる）
             scan_params = {
-                'Limit': limit * 2,  # スキャンの場合は多めに取得してソート
+                'Limit': limit,
                 'Select': 'ALL_ATTRIBUTES'
             }
             
-            if last_key:
+            # バケットごとのカーソルはスキャンには使えないため、テーブルキーの場合のみ再開
+            if last_key and 'post_id' in last_key:
                 scan_params['ExclusiveStartKey'] = last_key
             
-            response = table.scan(**scan_params)
-            
-            # created_at でソート
-            items = sorted(response['Items'], key=lambda x: x['created_at'], reverse=True)
+            response = self._posts.scan(**scan_params)
             
-            # 指定された数まで制限
-            items = items[:limit]
+            # ページ内を created_at の新しい順に並べる
+            items = sorted(response['Items'], key=itemgetter('created_at'), reverse=True)
             
             query_time = time.time() - start_time
-            self._record_query_metrics('timeline_scan_fallback', query_time, len(items))
+            self._record_query_metrics(QT_TIMELINE_SCAN, query_time, len(items))
             
             return {
                 'posts': items,
@@ -104,33 +264,86 @@ class DynamoDBOptimizer:
             logger.error(f"Fallback timeline scan failed: {e}")
             raise
     
+    def _parallel_timeline_scan(self, limit: int, last_key: Optional[Dict[str, Any]],
+                                start_time: float) -> Dict[str, Any]:
+        """
+        セグメント並列スキャンによるフォールバック
+        last_key の 'scan_segments' はセグメント番号（文字列）ごとのカーソル（None は読み切り済み）
+        """
+        segments = self.fallback_scan_segments
+        
+        try:
+            cursors = (last_key or {}).get('scan_segments') or {}
+            active = [
+                segment for segment in range(segments)
+                if not (str(segment) in cursors and cursors[str(segment)] is None)
+            ]
+            
+            # 逐次スキャンと同じ読み込み量をセグメントに分配（読み込んだ項目はすべて返す）
+            segment_limit = max(1, limit // segments)
+            
+            def scan_segment(segment):
+                scan_params = {
+                    'Limit': segment_limit,
+                    'Segment': segment,
+                    'TotalSegments': segments
+                }
+                if cursors.get(str(segment)):
+                    scan_params['ExclusiveStartKey'] = cursors[str(segment)]
+                # 低レベルクライアントはスレッドセーフ
+                return self.db.scan_raw('posts', **scan_params)
+            
+            responses = {}
+            if active:
+                with ThreadPoolExecutor(max_workers=len(active)) as executor:
+                    responses = dict(zip(active, executor.map(scan_segment, active)))
+            
+            # ページ内を created_at の新しい順に並べる
+            items = sorted(
+                (item for response in responses.values() for item in response['Items']),
+                key=itemgetter('created_at'),
+                reverse=True
+            )
+            
+            next_cursors = dict(cursors)
+            for segment, response in responses.items():
+                next_cursors[str(segment)] = response.get('LastEvaluatedKey')
+            has_more = any(cursor is not None for cursor in next_cursors.values())
+            
+            query_time = time.time() - start_time
+            self._record_query_metrics(QT_TIMELINE_SCAN, query_time, len(items))
+            
+            return {
+                'posts': items,
+                'last_evaluated_key': {'scan_segments': next_cursors} if has_more else None,
+                'has_more': has_more,
+                'query_time': query_time
+            }
+            
+        except Exception as e:
+            logger.error(f"Parallel fallback timeline scan failed: {e}")
+            raise
+    
     def optimize_user_posts_query(self, user_id: str, limit: int = 20, 
                                  last_key: Dict[str, str] = None) -> Dict[str, Any]:
         """ユーザー投稿取得クエリの最適化"""
-        @monitor_database_operation('user_posts_query_optimized', 'posts')
-        def _optimized_user_posts_query():
+        with monitor_database_block('user_posts_query_optimized', 'posts'):
             start_time = time.time()
             
             try:
-                table = self.db.get_table('posts')
-                
                 query_params = {
-                    'IndexName': 'user-posts-index',
-                    'KeyConditionExpression': 'user_id = :user_id',
+                    **_USER_POSTS_QUERY,
                     'ExpressionAttributeValues': {':user_id': user_id},
-                    'ScanIndexForward': False,  # 最新順
-                    'Limit': limit,
-                    # プロジェクション式で必要な属性のみ取得
-                    'ProjectionExpression': 'post_id, user_id, image_key, caption, likes_count, comments_count, created_at'
+                    'Limit': limit
                 }
                 
                 if last_key:
                     query_params['ExclusiveStartKey'] = last_key
                 
-                response = table.query(**query_params)
+                response = self.db.query_raw('posts', **query_params)
                 
                 query_time = time.time() - start_time
-                self._record_query_metrics('user_posts_query', query_time, len(response['Items']))
+                self._record_query_metrics(QT_USER_POSTS, query_time, len(response['Items']))
                 
                 return {
                     'posts': response['Items'],
@@ -142,43 +355,59 @@ class DynamoDBOptimizer:
             except Exception as e:
                 logger.error(f"Optimized user posts query failed for user {user_id}: {e}")
                 raise
-        
-        return _optimized_user_posts_query()
     
     def optimize_interactions_query(self, post_id: str, interaction_type: str = None, 
                                   limit: int = 50) -> List[Dict[str, Any]]:
         """インタラクション取得クエリの最適化"""
-        @monitor_database_operation('interactions_query_optimized', 'interactions')
-        def _optimized_interactions_query():
-            start_time = time.time()
-            
-            try:
-                table = self.db.get_table('interactions')
-                
+        return list(self.iter_interactions(post_id, interaction_type, limit))
+    
+    def iter_interactions(self, post_id: str, interaction_type: str = None,
+                          limit: int = 50) -> Iterator[Dict[str, Any]]:
+        """
+        インタラクションを最新順に1件ずつ返すジェネレータ
+        呼び出し側が途中で読むのをやめた場合、残りのページは取得しない
+        計測するのは各ページのクエリ時間のみ（呼び出し側の処理時間は含めない）
+        """
+        query_time = 0.0
+        count = 0
+        
+        try:
+            # 特定のインタラクションタイプでフィルタ
+            if interaction_type:
                 query_params = {
-                    'KeyConditionExpression': 'post_id = :post_id',
-                    'ExpressionAttributeValues': {':post_id': post_id},
-                    'Limit': limit,
-                    'ScanIndexForward': False  # 最新順
+                    **_INTERACTIONS_BY_TYPE_QUERY,
+                    'ExpressionAttributeValues': {
+                        ':post_id': post_id,
+                        ':type_lo': f'{interaction_type}#',
+                        ':type_hi': f'{interaction_type}#~'
+                    }
                 }
-                
-                # 特定のインタラクションタイプでフィルタ
-                if interaction_type:
-                    query_params['KeyConditionExpression'] += ' AND begins_with(interaction_id, :type_prefix)'
-                    query_params['ExpressionAttributeValues'][':type_prefix'] = f'{interaction_type}#'
-                
-                response = table.query(**query_params)
-                
-                query_time = time.time() - start_time
-                self._record_query_metrics('interactions_query', query_time, len(response['Items']))
-                
-                return response['Items']
-                
-            except Exception as e:
-                logger.error(f"Optimized interactions query failed for post {post_id}: {e}")
-                raise
-        
-        return _optimized_interactions_query()
+            else:
+                query_params = {
+                    **_INTERACTIONS_QUERY,
+                    'ExpressionAttributeValues': {':post_id': post_id}
+                }
+            
+            while count < limit:
+                page_start = time.time()
+                with monitor_database_block('interactions_query_optimized', 'interactions'):
+                    response = self.db.query_raw('interactions', Limit=limit - count, **query_params)
+                query_time += time.time() - page_start
+                
+                for item in response['Items']:
+                    count += 1
+                    yield item
+                
+                if 'LastEvaluatedKey' not in response:
+                    break
+                query_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            
+        except Exception as e:
+            logger.error(f"Optimized interactions query failed for post {post_id}: {e}")
+            raise
+        finally:
+            # 途中で打ち切られた場合も実際に返した件数で記録
+            self._record_query_metrics(QT_INTERACTIONS, query_time, count)
     
     def batch_get_users(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
         """ユーザー情報の一括取得（N+1問題の解決）"""
@@ -188,36 +417,19 @@ class DynamoDBOptimizer:
             
             try:
                 # DynamoDB BatchGetItem の制限（100件まで）を考慮
-                batch_size = 100
-                all_users = {}
+                # 重複キーは BatchGetItem がエラーにするため事前に除外
+                unique_ids = list(dict.fromkeys(user_ids))
                 
-                for i in range(0, len(user_ids), batch_size):
-                    batch_user_ids = user_ids[i:i + batch_size]
-                    
-                    # BatchGetItem リクエストの構築
-                    request_items = {
-                        'users': {
-                            'Keys': [{'user_id': user_id} for user_id in batch_user_ids],
-                            'ProjectionExpression': 'user_id, username, profile_image, bio'
-                        }
-                    }
-                    
-                    response = self.db.dynamodb.batch_get_item(RequestItems=request_items)
-                    
-                    # レスポンスの処理
-                    for item in response['Responses']['users']:
-                        all_users[item['user_id']] = item
-                    
-                    # 未処理のアイテムがある場合の処理
-                    while response.get('UnprocessedKeys'):
-                        response = self.db.dynamodb.batch_get_item(
-                            RequestItems=response['UnprocessedKeys']
-                        )
-                        for item in response['Responses']['users']:
-                            all_users[item['user_id']] = item
+                # キャッシュ済みのユーザーは DynamoDB に問い合わせない
+                all_users = self.user_cache.get_many(unique_ids)
+                missing_ids = [user_id for user_id in unique_ids if user_id not in all_users]
+                
+                for item in self.batch_get_items('users', 'user_id', missing_ids, USER_SUMMARY_PROJECTION):
+                    all_users[item['user_id']] = item
+                    self.user_cache.set(item['user_id'], item)
                 
                 query_time = time.time() - start_time
-                self._record_query_metrics('batch_get_users', query_time, len(all_users))
+                self._record_query_metrics(QT_BATCH_GET_USERS, query_time, len(all_users))
                 
                 return all_users
                 
@@ -227,82 +439,179 @@ class DynamoDBOptimizer:
         
         return _batch_get_users()
     
+    def invalidate_user(self, user_id: str):
+        """プロフィール更新時にキャッシュ済みユーザー情報を破棄"""
+        self.user_cache.invalidate(user_id)
+    
+    def invalidate_post(self, post_id: str):
+        """投稿の更新・削除時にキャッシュ済み投稿を破棄"""
+        self.post_cache.invalidate(post_id)
+    
+    def batch_get_items(self, table_type: str, key_name: str, key_values: List[str],
+                        projection: Optional[str] = None) -> List[Dict[str, Any]]:
+        """BatchGetItem の100件制限ごとにチャンク化し、複数チャンクは並列に取得"""
+        batch_size = 100
+        
+        # スライスのコピーを作らず、イテレータから直接 Keys を組み立てる
+        key_iter = iter(key_values)
+        chunks = []
+        while keys := [{key_name: value} for value in islice(key_iter, batch_size)]:
+            chunks.append(keys)
+        
+        def fetch(keys):
+            return self._batch_get_chunk(table_type, keys, projection)
+        
+        if len(chunks) > 1:
+            # 各チャンクを並列に取得（低レベルクライアントはスレッドセーフ）
+            workers = min(len(chunks), self.batch_get_max_workers)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(fetch, chunks))
+        else:
+            results = [fetch(chunk) for chunk in chunks]
+        
+        return [item for items in results for item in items]
+    
+    def _batch_get_chunk(self, table_type: str, keys: List[Dict[str, Any]],
+                         projection: Optional[str] = None) -> List[Dict[str, Any]]:
+        """100件以下のキーを BatchGetItem で取得（UnprocessedKeys はジッター付き指数バックオフで再試行）"""
+        table_name = self.db.table_names[table_type]
+        request = {'Keys': [self.db.serialize_item(key) for key in keys]}
+        if projection:
+            request['ProjectionExpression'] = projection
+        request_items = {table_name: request}
+        
+        items = []
+        delay = 0.05
+        retries = 0
+        while True:
+            response = self.db.client.batch_get_item(RequestItems=request_items)
+            for item in response.get('Responses', {}).get(table_name, []):
+                items.append(self.db.deserialize_item(item))
+            
+            request_items = response.get('UnprocessedKeys')
+            if not request_items:
+                return items
+            
+            if retries >= self.batch_get_max_retries:
+                raise RuntimeError(
+                    f"Batch get on {table_name} left unprocessed keys after {retries} retries"
+                )
+            
+            # スロットリング時は 50ms から倍々で待機（上限2秒、±50% のジッター）
+            time.sleep(min(delay, 2.0) * (0.5 + random.random()))
+            delay *= 2
+            retries += 1
+    
     def get_post_with_user_info(self, post_id: str) -> Optional[Dict[str, Any]]:
         """投稿とユーザー情報を効率的に取得"""
-        @monitor_database_operation('post_with_user_info', 'posts')
-        def _get_post_with_user_info():
+        posts = self.get_posts_with_user_info([post_id])
+        return posts[0] if posts else None
+    
+    def get_posts_with_user_info(self, post_ids: List[str]) -> List[Dict[str, Any]]:
+        """複数投稿とユーザー情報を BatchGetItem 2回で取得（post_ids の順序を維持）"""
+        @monitor_database_operation('posts_with_user_info', 'posts')
+        def _get_posts_with_user_info():
             start_time = time.time()
             
             try:
-                # 投稿情報を取得
-                posts_table = self.db.get_table('posts')
-                post_response = posts_table.get_item(Key={'post_id': post_id})
-                
-                if 'Item' not in post_response:
-                    return None
-                
-                post = post_response['Item']
-                
-                # ユーザー情報を取得
-                users_table = self.db.get_table('users')
-                user_response = users_table.get_item(
-                    Key={'user_id': post['user_id']},
-                    ProjectionExpression='user_id, username, profile_image, bio'
-                )
-                
-                if 'Item' in user_response:
-                    post['user'] = user_response['Item']
+                # 投稿情報を一括取得（キャッシュ済みの投稿は DynamoDB に問い合わせない）
+                unique_ids = list(dict.fromkeys(post_ids))
+                cached_posts = self.post_cache.get_many(unique_ids)
+                missing_ids = [post_id for post_id in unique_ids if post_id not in cached_posts]
+                for post in self.batch_get_items('posts', 'post_id', missing_ids):
+                    cached_posts[post['post_id']] = post
+                    self.post_cache.set(post['post_id'], post)
+                
+                # 投稿者情報を一括取得して付与（キャッシュ上の投稿は変更しない）
+                users = self.batch_get_users([post['user_id'] for post in cached_posts.values()])
+                posts_by_id = {}
+                for post_id, post in cached_posts.items():
+                    post = dict(post)
+                    user = users.get(post['user_id'])
+                    if user is not None:
+                        post['user'] = user
+                    posts_by_id[post_id] = post
+                
+                posts = [posts_by_id[post_id] for post_id in unique_ids if post_id in posts_by_id]
                 
                 query_time = time.time() - start_time
-                self._record_query_metrics('post_with_user_info', query_time, 1)
+                self._record_query_metrics(QT_POSTS_WITH_USER_INFO, query_time, len(posts))
                 
-                return post
+                return posts
                 
             except Exception as e:
-                logger.error(f"Get post with user info failed for post {post_id}: {e}")
+                logger.error(f"Get posts with user info failed for {len(post_ids)} posts: {e}")
                 raise
         
-        return _get_post_with_user_info()
+        return _get_posts_with_user_info()
     
     def _record_query_metrics(self, query_type: str, execution_time: float, item_count: int):
         """クエリメトリクスの記録"""
-        if query_type not in self.query_metrics:
-            self.query_metrics[query_type] = {
-                'total_queries': 0,
-                'total_time': 0,
-                'total_items': 0,
-                'slow_queries': 0,
-                'max_time': 0,
-                'min_time': float('inf')
-            }
+        is_slow = execution_time > self.slow_query_threshold
+        micros = min(max(int(execution_time * 1_000_000), 1), _HIST_MAX_MICROS)
         
-        metrics = self.query_metrics[query_type]
-        metrics['total_queries'] += 1
-        metrics['total_time'] += execution_time
-        metrics['total_items'] += item_count
-        metrics['max_time'] = max(metrics['max_time'], execution_time)
-        metrics['min_time'] = min(metrics['min_time'], execution_time)
+        with self._metrics_lock:
+            idx = self._qt_index.get(query_type)
+            if idx is None:
+                # 初回は最初の計測値で列を追加
+                self._qt_index[query_type] = len(self._qt_names)
+                self._qt_names.append(query_type)
+                self._total_queries.append(1)
+                self._total_time.append(execution_time)
+                self._total_items.append(item_count)
+                self._slow_queries.append(1 if is_slow else 0)
+                self._max_time.append(execution_time)
+                self._min_time.append(execution_time)
+                self._histograms.append(HdrHistogram(1, _HIST_MAX_MICROS, 3) if HDR_AVAILABLE else None)
+                idx = len(self._qt_names) - 1
+                if HDR_AVAILABLE:
+                    self._histograms[idx].record_value(micros)
+            else:
+                self._total_queries[idx] += 1
+                self._total_time[idx] += execution_time
+                self._total_items[idx] += item_count
+                if is_slow:
+                    self._slow_queries[idx] += 1
+                if execution_time > self._max_time[idx]:
+                    self._max_time[idx] = execution_time
+                if execution_time < self._min_time[idx]:
+                    self._min_time[idx] = execution_time
+                if HDR_AVAILABLE:
+                    self._histograms[idx].record_value(micros)
         
-        if execution_time > self.slow_query_threshold:
-            metrics['slow_queries'] += 1
+        if is_slow:
             logger.warning(f"Slow query detected: {query_type} took {execution_time:.2f}s")
     
     def get_query_metrics(self) -> Dict[str, Any]:
         """クエリメトリクスの取得"""
-        summary = {}
-        
-        for query_type, metrics in self.query_metrics.items():
-            if metrics['total_queries'] > 0:
-                summary[query_type] = {
-                    'total_queries': metrics['total_queries'],
-                    'avg_time': metrics['total_time'] / metrics['total_queries'],
-                    'avg_items_per_query': metrics['total_items'] / metrics['total_queries'],
-                    'slow_query_percentage': (metrics['slow_queries'] / metrics['total_queries']) * 100,
-                    'max_time': metrics['max_time'],
-                    'min_time': metrics['min_time'] if metrics['min_time'] != float('inf') else 0
-                }
+        # 記録中の値と混ざらないようスナップショットを取得
+        with self._metrics_lock:
+            snapshot = list(zip(
+                self._qt_names, self._total_queries, self._total_time, self._total_items,
+                self._slow_queries, self._max_time, self._min_time
+            ))
+            percentiles = [
+                {
+                    f'p{p}_time': hist.get_value_at_percentile(p) / 1_000_000
+                    for p in (50, 95, 99)
+                } if hist is not None else {}
+                for hist in self._histograms
+            ]
         
-        return summary
+        # 列は初回記録時に追加されるため total_queries は常に1以上（min_time も実測値）
+        return {
+            query_type: {
+                'total_queries': total_queries,
+                'avg_time': total_time / total_queries,
+                'avg_items_per_query': total_items / total_queries,
+                'slow_query_percentage': (slow_queries / total_queries) * 100,
+                'max_time': max_time,
+                'min_time': min_time,
+                **tail
+            }
+            for (query_type, total_queries, total_time, total_items,
+                 slow_queries, max_time, min_time), tail in zip(snapshot, percentiles)
+        }
     
     def optimize_conditional_updates(self, table_name: str, key: Dict[str, Any], 
                                    updates: Dict[str, Any], conditions: Dict[str, Any] = None) -> bool:
@@ -315,19 +624,9 @@ class DynamoDBOptimizer:
                 table = self.db.get_table(table_name)
                 
                 # 更新式の構築
-                update_expression = "SET "
-                expression_attribute_values = {}
-                expression_attribute_names = {}
-                
-                for attr, value in updates.items():
-                    attr_name = f"#{attr}"
-                    attr_value = f":{attr}"
-                    
-                    update_expression += f"{attr_name} = {attr_value}, "
-                    expression_attribute_names[attr_name] = attr
-                    expression_attribute_values[attr_value] = value
-                
-                update_expression = update_expression.rstrip(', ')
+                update_expression = "SET " + ", ".join(f"#{attr} = :{attr}" for attr in updates)
+                expression_attribute_names = {f"#{attr}": attr for attr in updates}
+                expression_attribute_values = {f":{attr}": value for attr, value in updates.items()}
                 
                 # 条件式の構築
                 condition_expression = None
@@ -336,24 +635,18 @@ class DynamoDBOptimizer:
                     for attr, condition in conditions.items():
                         if isinstance(condition, dict):
                             for op, value in condition.items():
+                                fmt = _COND_FMTS.get(op)
+                                if fmt is None:
+                                    raise ValueError(f"Unsupported condition operator: {op}")
+                                
                                 attr_name = f"#cond_{attr}"
                                 attr_value = f":cond_{attr}"
                                 
                                 expression_attribute_names[attr_name] = attr
-                                expression_attribute_values[attr_value] = value
+                                if op not in _VALUELESS_CONDS:
+                                    expression_attribute_values[attr_value] = value
                                 
-                                if op == 'exists':
-                                    condition_parts.append(f"attribute_exists({attr_name})")
-                                elif op == 'not_exists':
-                                    condition_parts.append(f"attribute_not_exists({attr_name})")
-                                elif op == 'eq':
-                                    condition_parts.append(f"{attr_name} = {attr_value}")
-                                elif op == 'ne':
-                                    condition_parts.append(f"{attr_name} <> {attr_value}")
-                                elif op == 'gt':
-                                    condition_parts.append(f"{attr_name} > {attr_value}")
-                                elif op == 'lt':
-                                    condition_parts.append(f"{attr_name} < {attr_value}")
+                                condition_parts.append(fmt(attr_name, attr_value))
                     
                     condition_expression = ' AND '.join(condition_parts)
                 
@@ -372,7 +665,7 @@ class DynamoDBOptimizer:
                 response = table.update_item(**update_params)
                 
                 query_time = time.time() - start_time
-                self._record_query_metrics('conditional_update', query_time, 1)
+                self._record_query_metrics(QT_CONDITIONAL_UPDATE, query_time, 1)
                 
                 return True
                 
@@ -394,16 +687,20 @@ class DynamoDBOptimizer:
         index_recommendations = {
             'posts': [
                 {
-                    'IndexName': 'timeline-index',
+                    'IndexName': TIMELINE_INDEX,
                     'KeySchema': [
-                        {'AttributeName': 'timeline_pk', 'KeyType': 'HASH'},
+                        {'AttributeName': 'timeline_bucket', 'KeyType': 'HASH'},
                         {'AttributeName': 'created_at', 'KeyType': 'RANGE'}
                     ],
                     'AttributeDefinitions': [
-                        {'AttributeName': 'timeline_pk', 'AttributeType': 'S'},
+                        {'AttributeName': 'timeline_bucket', 'AttributeType': 'S'},
                         {'AttributeName': 'created_at', 'AttributeType': 'S'}
                     ],
-                    'Projection': {'ProjectionType': 'ALL'},
+                    # 表示に必要な属性のみ射影し、GSI のストレージと書き込み増幅を抑える
+                    'Projection': {
+                        'ProjectionType': 'INCLUDE',
+                        'NonKeyAttributes': TIMELINE_PROJECTED_ATTRIBUTES
+                    },
                     'Purpose': 'タイムライン取得の最適化（スキャン回避）'
                 },
                 {
@@ -466,10 +763,10 @@ class DynamoDBOptimizer:
     def analyze_table_performance(self, table_name: str) -> Dict[str, Any]:
         """テーブルパフォーマンスの分析"""
         try:
-            table = self.db.get_table(table_name)
-            
-            # テーブル情報の取得
-            table_description = table.meta.client.describe_table(TableName=table_name)
+            # テーブル情報の取得（DAX は DescribeTable を提供しないためコントロールプレーンを使用）
+            table_description = self.db.control_dynamodb.meta.client.describe_table(
+                TableName=self.db.table_names[table_name]
+            )
             table_info = table_description['Table']
             
             analysis = {
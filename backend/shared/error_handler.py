@@ -4,10 +4,13 @@
 """
 import logging
 import traceback
-import uuid
+import secrets
 import time
-import psutil
+import threading
 import os
+import itertools
+from collections import Counter
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from enum import Enum
 from datetime import datetime
@@ -16,6 +19,62 @@ from .logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# システムコンテキストのサンプリングキャッシュ（エラー多発時に毎回 psutil を呼ばない）
+_SYSTEM_CONTEXT_TTL = 5.0
+_DISK_USAGE_TTL = 60.0
+_sys_ctx_lock = threading.Lock()
+_sys_ctx_cache = {'t': float('-inf'), 'v': {}}
+_disk_usage_cache = {'t': float('-inf'), 'v': None}
+
+# エラーID: プロセス毎のランダムな接頭辞 + 連番（エラー毎に乱数を生成しない）
+_EID_SEED = secrets.token_hex(2)
+_EID_CTR = itertools.count()
+
+def _next_error_id() -> str:
+    """エラーIDを生成（8桁から始まり、65536件を超えると桁が増えるためプロセス内で重複しない）
+    itertools.count は C レベルでアトミック"""
+    return f"{_EID_SEED}{next(_EID_CTR):04x}"
+
+def _reseed_error_ids():
+    """fork 後の子プロセスで接頭辞を振り直す（preload 時のワーカー間重複を防ぐ）"""
+    global _EID_SEED, _EID_CTR
+    _EID_SEED = secrets.token_hex(2)
+    _EID_CTR = itertools.count()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed_error_ids)
+
+# エラータイムスタンプ: ISO 文字列を秒単位でキャッシュ（競合時は再計算されるだけで安全）
+_ts_cache = [0, ""]
+
+def _iso_now() -> str:
+    """現在時刻（UTC, 秒精度）の ISO 8601 文字列を取得"""
+    now = int(time.time())
+    if now != _ts_cache[0]:
+        _ts_cache[1] = datetime.utcfromtimestamp(now).isoformat()
+        _ts_cache[0] = now
+    return _ts_cache[1]
+
+# 開発環境判定（エラー毎に環境変数を参照しないよう起動時に一度だけ解決）
+_IS_DEV = os.getenv('FLASK_ENV') == 'development'
+
+def set_dev_mode(enabled: bool):
+    """開発モード（レスポンスへのデバッグ情報付与）を実行時に切り替え"""
+    global _IS_DEV
+    _IS_DEV = enabled
+
+# psutil は C 拡張の読み込みが重いため、最初にシステムコンテキストを取得する時に import する
+_psutil = None
+_process = None
+
+def _get_psutil():
+    """psutil モジュールを遅延 import して返す"""
+    global _psutil
+    if _psutil is None:
+        import psutil
+        _psutil = psutil
+    return _psutil
+
 class ErrorCode(Enum):
     """Standard error codes for the application"""
     VALIDATION_ERROR = "VALIDATION_ERROR"
@@ -28,6 +87,12 @@ class ErrorCode(Enum):
     EXTERNAL_SERVICE_ERROR = "EXTERNAL_SERVICE_ERROR"
     INTERNAL_ERROR = "INTERNAL_ERROR"
 
+# Enum の .value はアクセスの度にディスクリプタを経由するため、文字列を事前に引いておく
+_EC_VALUE = {ec: ec.value for ec in ErrorCode}
+
+# 追加のセキュリティログを出力するエラーコード
+_SECURITY_CODES = frozenset({ErrorCode.AUTHORIZATION_ERROR, ErrorCode.AUTHENTICATION_ERROR})
+
 class AppError(Exception):
     """強化されたベースアプリケーションエラークラス"""
     
@@ -40,8 +105,8 @@ class AppError(Exception):
         self.error_code = error_code
         self.status_code = status_code
         self.details = details or {}
-        self.timestamp = datetime.utcnow().isoformat()
-        self.error_id = str(uuid.uuid4())[:8]
+        self.timestamp = _iso_now()
+        self.error_id = _next_error_id()
         self.request_id = getattr(g, 'request_id', None)
     
     def to_dict(self, include_debug: bool = False) -> Dict[str, Any]:
@@ -49,7 +114,7 @@ class AppError(Exception):
         error_dict = {
             "success": False,
             "error": {
-                "code": self.error_code.value,
+                "code": _EC_VALUE[self.error_code],
                 "message": self.user_message,
                 "error_id": self.error_id,
                 "timestamp": self.timestamp
@@ -126,7 +191,7 @@ class ErrorContext:
     def get_request_context():
         """リクエストコンテキスト情報を取得"""
         context = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': _iso_now(),
             'request_id': getattr(g, 'request_id', None),
             'path': getattr(request, 'path', None),
             'method': getattr(request, 'method', None),
@@ -148,72 +213,112 @@ class ErrorContext:
     
     @staticmethod
     def get_system_context():
-        """システムコンテキスト情報を取得"""
-        try:
-            process = psutil.Process()
-            return {
-                'process_id': os.getpid(),
-                'memory_usage_mb': process.memory_info().rss / 1024 / 1024,
-                'cpu_percent': psutil.cpu_percent(),
-                'disk_usage_percent': psutil.disk_usage('/').percent,
-                'load_average': os.getloadavg() if hasattr(os, 'getloadavg') else None,
-            }
-        except Exception:
-            return {}
+        """システムコンテキスト情報を取得（5秒間は同じサンプルを再利用）"""
+        global _process
+        now = time.monotonic()
+        with _sys_ctx_lock:
+            if now - _sys_ctx_cache['t'] < _SYSTEM_CONTEXT_TTL:
+                return _sys_ctx_cache['v']
+            
+            try:
+                psutil = _get_psutil()
+                
+                # ディスク使用率は変化が遅いため、さらに長い間隔でのみ取得
+                if now - _disk_usage_cache['t'] >= _DISK_USAGE_TTL:
+                    _disk_usage_cache['v'] = psutil.disk_usage('/').percent
+                    _disk_usage_cache['t'] = now
+                
+                # Process ハンドルは使い回す（fork 後は pid が変わるので作り直す）
+                pid = os.getpid()
+                if _process is None or _process.pid != pid:
+                    _process = psutil.Process(pid)
+                process = _process
+                
+                context = {
+                    'process_id': pid,
+                    'memory_usage_mb': process.memory_info().rss / 1024 / 1024,
+                    'cpu_percent': psutil.cpu_percent(interval=None),
+                    'disk_usage_percent': _disk_usage_cache['v'],
+                    'load_average': os.getloadavg() if hasattr(os, 'getloadavg') else None,
+                }
+            except Exception:
+                context = {}
+            
+            _sys_ctx_cache['t'] = now
+            _sys_ctx_cache['v'] = context
+            return context
+
+def _request_context() -> Dict[str, Any]:
+    """リクエストコンテキストを取得（同一リクエスト内では g にキャッシュして再利用）"""
+    context = getattr(g, '_error_request_context', None)
+    if context is None:
+        context = ErrorContext.get_request_context()
+        g._error_request_context = context
+    return context
+
+def _system_context() -> Dict[str, Any]:
+    """システムコンテキストを取得（同一リクエスト内では g にキャッシュして再利用）"""
+    context = getattr(g, '_error_system_context', None)
+    if context is None:
+        context = ErrorContext.get_system_context()
+        g._error_system_context = context
+    return context
+
+@lru_cache(maxsize=256)
+def _metrics_key(error_code: str, status_code: int) -> str:
+    """メトリクスキーを生成（同じ組み合わせは文字列を再利用）"""
+    return f"{error_code}_{status_code}"
 
 class ErrorMetrics:
     """エラーメトリクス収集クラス"""
     
     def __init__(self):
-        self.error_counts = {}
+        self.error_counts = Counter()
         self.error_rates = {}
-        self.last_reset = time.time()
+        self.last_reset = time.monotonic()
     
     def record_error(self, error_code: str, status_code: int):
         """エラーを記録"""
-        key = f"{error_code}_{status_code}"
-        self.error_counts[key] = self.error_counts.get(key, 0) + 1
+        key = _metrics_key(error_code, status_code)
+        self.error_counts[key] += 1
         
         # 1時間ごとにリセット
-        if time.time() - self.last_reset > 3600:
+        if time.monotonic() - self.last_reset > 3600:
             self.reset_metrics()
     
     def get_error_rate(self, error_code: str, status_code: int) -> int:
         """エラー率を取得"""
-        key = f"{error_code}_{status_code}"
-        return self.error_counts.get(key, 0)
+        key = _metrics_key(error_code, status_code)
+        return self.error_counts[key]
     
     def reset_metrics(self):
         """メトリクスをリセット"""
         self.error_counts.clear()
-        self.last_reset = time.time()
+        self.last_reset = time.monotonic()
     
     def get_top_errors(self, limit: int = 10) -> list:
         """上位エラーを取得"""
-        sorted_errors = sorted(
-            self.error_counts.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )
-        return sorted_errors[:limit]
+        return self.error_counts.most_common(limit)
 
 # グローバルエラーメトリクスインスタンス
 error_metrics = ErrorMetrics()
 
 def handle_app_error(error: AppError):
     """強化されたアプリケーションエラーハンドリング"""
-    request_context = ErrorContext.get_request_context()
-    system_context = ErrorContext.get_system_context()
+    request_context = _request_context()
+    # ERROR ログが無効な場合はシステム情報の取得自体を省略
+    system_context = _system_context() if logger.isEnabledFor(logging.ERROR) else {}
     
     # エラーメトリクス記録
-    error_metrics.record_error(error.error_code.value, error.status_code)
+    error_code_value = _EC_VALUE[error.error_code]
+    error_metrics.record_error(error_code_value, error.status_code)
     
     # 詳細ログ出力
     logger.error(
         f"Application error [{error.error_id}]: {error.message}",
         extra={
             'error_id': error.error_id,
-            'error_code': error.error_code.value,
+            'error_code': error_code_value,
             'status_code': error.status_code,
             'error_details': error.details,
             'request_context': request_context,
@@ -223,20 +328,19 @@ def handle_app_error(error: AppError):
     )
     
     # セキュリティ関連エラーの場合は追加ログ
-    if error.error_code in [ErrorCode.AUTHORIZATION_ERROR, ErrorCode.AUTHENTICATION_ERROR]:
+    if error.error_code in _SECURITY_CODES:
         logger.warning(
             f"Security incident [{error.error_id}]: {error.message}",
             extra={
                 'incident_type': 'security_error',
-                'error_code': error.error_code.value,
+                'error_code': error_code_value,
                 'request_context': request_context,
                 'severity': 'high'
             }
         )
     
     # 開発環境では詳細情報を含める
-    include_debug = os.getenv('FLASK_ENV') == 'development'
-    response_data = error.to_dict(include_debug=include_debug)
+    response_data = error.to_dict(include_debug=_IS_DEV)
     
     # レスポンス構築
     response = jsonify(response_data)
@@ -250,43 +354,41 @@ def handle_app_error(error: AppError):
 
 def handle_generic_error(error: Exception):
     """強化された汎用エラーハンドリング"""
-    error_id = str(uuid.uuid4())[:8]
-    request_context = ErrorContext.get_request_context()
-    system_context = ErrorContext.get_system_context()
+    error_id = _next_error_id()
     
     # エラーメトリクス記録
     error_metrics.record_error('INTERNAL_ERROR', 500)
     
-    # 詳細ログ出力
-    logger.error(
-        f"Unhandled error [{error_id}]: {str(error)}",
-        extra={
-            'error_id': error_id,
-            'error_type': type(error).__name__,
-            'error_message': str(error),
-            'traceback': traceback.format_exc(),
-            'request_context': request_context,
-            'system_context': system_context,
-            'severity': 'critical'
-        }
-    )
+    # 詳細ログ出力（ERROR ログが無効な場合はトレースバック・コンテキストの生成自体を省略）
+    if logger.isEnabledFor(logging.ERROR):
+        logger.error(
+            f"Unhandled error [{error_id}]: {str(error)}",
+            extra={
+                'error_id': error_id,
+                'error_type': type(error).__name__,
+                'error_message': str(error),
+                'traceback': traceback.format_exc(),
+                'request_context': _request_context(),
+                'system_context': _system_context(),
+                'severity': 'critical'
+            }
+        )
     
     # 本番環境では詳細なエラー情報を隠す
-    is_development = os.getenv('FLASK_ENV') == 'development'
     user_message = "サーバー内部エラーが発生しました。しばらく後でお試しください。"
     
     response_data = {
         "success": False,
         "error": {
-            "code": ErrorCode.INTERNAL_ERROR.value,
+            "code": _EC_VALUE[ErrorCode.INTERNAL_ERROR],
             "message": user_message,
             "error_id": error_id,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": _iso_now()
         }
     }
     
     # 開発環境では詳細情報を含める
-    if is_development:
+    if _IS_DEV:
         response_data["error"]["debug_message"] = str(error)
         response_data["error"]["error_type"] = type(error).__name__
     
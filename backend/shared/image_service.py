@@ -3,16 +3,48 @@ Image processing and S3 upload service for photo sharing app
 """
 import os
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 import uuid
 from PIL import Image, ImageOps
 from io import BytesIO
 import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Tuple, Optional
 from .logging_config import get_logger
 from .error_handler import ValidationError
+from .cache import TTLCache
 
 logger = get_logger(__name__)
 
+# Prefer libvips for resizing when it is installed (pyvips raises OSError if libvips is missing)
+try:
+    import pyvips
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):
+    PYVIPS_AVAILABLE = False
+
+# Shared pool for uploading the image sizes concurrently (S3 clients are thread-safe)
+_upload_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix='s3-upload')
+
+# Enough pooled keep-alive connections for concurrent uploads across request threads
+S3_CLIENT_CONFIG = Config(
+    max_pool_connections=32,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 3},
+    connect_timeout=3,
+    read_timeout=10
+)
+
+# Bodies at or above the threshold are sent as a parallel multipart upload
+# (5MB is also the smallest part size S3 accepts)
+_transfer_config = TransferConfig(
+    multipart_threshold=5 * 1024 * 1024,
+    multipart_chunksize=5 * 1024 * 1024,
+    max_concurrency=4,
+    use_threads=True
+)
+
 class ImageService:
     """Service for handling image uploads, processing, and S3 operations"""
     
@@ -25,16 +57,24 @@ class ImageService:
     THUMBNAIL_SIZE = (300, 300)
     MEDIUM_SIZE = (800, 800)
     
+    # Presigned GET URLs with the default expiry are reused for half their lifetime
+    DEFAULT_URL_EXPIRES_IN = 3600
+    
     def __init__(self):
         """Initialize ImageService with S3 client"""
         self.s3_client = boto3.client(
             's3',
+            config=S3_CLIENT_CONFIG,
             endpoint_url=os.getenv('S3_ENDPOINT_URL', 'http://localstack:4566'),
             aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID', 'test'),
             aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', 'test'),
             region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1')
         )
         self.bucket_name = os.getenv('S3_BUCKET_NAME', 'photo-sharing-images')
+        self._url_cache = TTLCache(
+            maxsize=int(os.getenv('IMAGE_URL_CACHE_MAXSIZE', '10000')),
+            ttl=self.DEFAULT_URL_EXPIRES_IN / 2
+        )
         
         # Ensure bucket exists
         self._ensure_bucket_exists()
@@ -65,6 +105,81 @@ class ImageService:
         Raises:
             ValidationError: If validation fails
         """
+        self._check_upload(file_data, filename, content_type)
+        
+        try:
+            # Validate image content using Pillow (single open; header gives format and size)
+            with Image.open(BytesIO(file_data)) as img:
+                image_format, width, height = self._check_image_header(img)
+                
+                # Check if it's a valid image
+                if image_format == 'JPEG':
+                    # Decode at reduced scale from the DCT coefficients; catches truncated data
+                    img.draft('RGB', self.MEDIUM_SIZE)
+                    img.load()
+                else:
+                    img.verify()
+                
+                return self._validation_result(file_data, image_format, width, height, content_type)
+                
+        except Exception as e:
+            if isinstance(e, ValidationError):
+                raise
+            logger.error(f"Image validation failed: {e}")
+            raise ValidationError("無効な画像ファイルです。")
+    
+    def validate_and_process(self, file_data: bytes, filename: str,
+                             content_type: str) -> Tuple[Dict[str, any], Dict[str, bytes]]:
+        """
+        Validate an upload and create its sizes, decoding the image only once
+        
+        Args:
+            file_data: Raw file bytes
+            filename: Original filename
+            content_type: MIME type
+            
+        Returns:
+            Tuple of (validation results, processed image data for different sizes)
+            
+        Raises:
+            ValidationError: If validation or processing fails
+        """
+        self._check_upload(file_data, filename, content_type)
+        
+        try:
+            source = Image.open(BytesIO(file_data))
+        except Exception as e:
+            logger.error(f"Image validation failed: {e}")
+            raise ValidationError("無効な画像ファイルです。")
+        
+        with source:
+            try:
+                image_format, width, height = self._check_image_header(source)
+                if not PYVIPS_AVAILABLE:
+                    # The full decode used for processing doubles as the integrity check
+                    source.load()
+            except Exception as e:
+                if isinstance(e, ValidationError):
+                    raise
+                logger.error(f"Image validation failed: {e}")
+                raise ValidationError("無効な画像ファイルです。")
+            
+            validation_result = self._validation_result(file_data, image_format, width, height, content_type)
+            
+            try:
+                if PYVIPS_AVAILABLE:
+                    processed_images = self._process_image_vips(file_data)
+                else:
+                    processed_images = self._create_sizes_pillow(source, file_data)
+            except Exception as e:
+                logger.error(f"Image processing failed for {filename}: {e}")
+                raise ValidationError("画像の処理に失敗しました。")
+        
+        logger.info(f"Processed image {filename} into {len(processed_images)} sizes")
+        return validation_result, processed_images
+    
+    def _check_upload(self, file_data: bytes, filename: str, content_type: str):
+        """Check upload size, MIME type and file extension"""
         # Check file size
         if len(file_data) > self.MAX_FILE_SIZE:
             raise ValidationError(f"ファイルサイズが制限を超えています。最大{self.MAX_FILE_SIZE // (1024*1024)}MBまでです。")
@@ -77,36 +192,28 @@ class ImageService:
         file_ext = filename.lower().split('.')[-1] if '.' in filename else ''
         if file_ext not in ['jpg', 'jpeg', 'png']:
             raise ValidationError("ファイル拡張子が無効です。.jpg、.jpeg、.pngのみ対応しています。")
+    
+    def _check_image_header(self, img: Image.Image) -> Tuple[str, int, int]:
+        """Check the decoded header's format and return (format, width, height)"""
+        image_format = img.format
+        width, height = img.size
         
-        try:
-            # Validate image content using Pillow
-            with Image.open(BytesIO(file_data)) as img:
-                # Check if it's a valid image
-                img.verify()
-                
-                # Re-open for getting info (verify() closes the image)
-                img = Image.open(BytesIO(file_data))
-                
-                # Check format
-                if img.format not in self.SUPPORTED_FORMATS:
-                    raise ValidationError(f"サポートされていない画像形式です: {img.format}")
-                
-                # Get image dimensions
-                width, height = img.size
-                
-                return {
-                    'valid': True,
-                    'format': img.format,
-                    'size': len(file_data),
-                    'dimensions': {'width': width, 'height': height},
-                    'content_type': content_type
-                }
-                
-        except Exception as e:
-            if isinstance(e, ValidationError):
-                raise
-            logger.error(f"Image validation failed: {e}")
-            raise ValidationError("無効な画像ファイルです。")
+        # Check format
+        if image_format not in self.SUPPORTED_FORMATS:
+            raise ValidationError(f"サポートされていない画像形式です: {image_format}")
+        
+        return image_format, width, height
+    
+    def _validation_result(self, file_data: bytes, image_format: str, width: int, height: int,
+                           content_type: str) -> Dict[str, any]:
+        """Build the validation result returned to API callers"""
+        return {
+            'valid': True,
+            'format': image_format,
+            'size': len(file_data),
+            'dimensions': {'width': width, 'height': height},
+            'content_type': content_type
+        }
     
     def process_image(self, file_data: bytes, filename: str) -> Dict[str, bytes]:
         """
@@ -119,50 +226,102 @@ class ImageService:
         Returns:
             Dict with processed image data for different sizes
         """
-        processed_images = {}
-        
         try:
-            with Image.open(BytesIO(file_data)) as img:
-                # Convert to RGB if necessary (for PNG with transparency)
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    # Create white background
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                    img = background
-                elif img.mode != 'RGB':
-                    img = img.convert('RGB')
-                
-                # Apply EXIF orientation
-                img = ImageOps.exif_transpose(img)
-                
-                # Original (potentially compressed)
-                original_buffer = BytesIO()
-                img.save(original_buffer, format='JPEG', quality=90, optimize=True)
-                processed_images['original'] = original_buffer.getvalue()
-                
-                # Medium size
-                medium_img = img.copy()
-                medium_img.thumbnail(self.MEDIUM_SIZE, Image.Resampling.LANCZOS)
-                medium_buffer = BytesIO()
-                medium_img.save(medium_buffer, format='JPEG', quality=85, optimize=True)
-                processed_images['medium'] = medium_buffer.getvalue()
-                
-                # Thumbnail
-                thumb_img = img.copy()
-                thumb_img.thumbnail(self.THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
-                thumb_buffer = BytesIO()
-                thumb_img.save(thumb_buffer, format='JPEG', quality=80, optimize=True)
-                processed_images['thumbnail'] = thumb_buffer.getvalue()
-                
-                logger.info(f"Processed image {filename} into {len(processed_images)} sizes")
-                return processed_images
-                
+            if PYVIPS_AVAILABLE:
+                processed_images = self._process_image_vips(file_data)
+            else:
+                processed_images = self._process_image_pillow(file_data)
+            
+            logger.info(f"Processed image {filename} into {len(processed_images)} sizes")
+            return processed_images
+            
         except Exception as e:
             logger.error(f"Image processing failed for {filename}: {e}")
             raise ValidationError("画像の処理に失敗しました。")
     
+    def _process_image_vips(self, file_data: bytes) -> Dict[str, bytes]:
+        """Create the image sizes with libvips (shrink-on-load, streaming resize)"""
+        def to_rgb(img):
+            # Flatten transparency onto white and normalise to sRGB, like the Pillow path
+            if img.hasalpha():
+                img = img.flatten(background=[255, 255, 255])
+            if img.interpretation != 'srgb':
+                img = img.colourspace('srgb')
+            return img
+        
+        original = to_rgb(pyvips.Image.new_from_buffer(file_data, '').autorot())
+        
+        # thumbnail_buffer applies EXIF orientation and never upscales with size='down'
+        medium = to_rgb(pyvips.Image.thumbnail_buffer(
+            file_data, self.MEDIUM_SIZE[0], height=self.MEDIUM_SIZE[1], size='down'
+        ))
+        thumb = to_rgb(pyvips.Image.thumbnail_buffer(
+            file_data, self.THUMBNAIL_SIZE[0], height=self.THUMBNAIL_SIZE[1], size='down'
+        ))
+        
+        return {
+            'original': original.jpegsave_buffer(Q=90, optimize_coding=True, strip=True),
+            'medium': medium.jpegsave_buffer(Q=85, optimize_coding=True, strip=True),
+            'thumbnail': thumb.jpegsave_buffer(Q=80, optimize_coding=True, strip=True)
+        }
+    
+    def _process_image_pillow(self, file_data: bytes) -> Dict[str, bytes]:
+        """Create the image sizes with Pillow"""
+        with Image.open(BytesIO(file_data)) as source:
+            return self._create_sizes_pillow(source, file_data)
+    
+    def _create_sizes_pillow(self, source: Image.Image, file_data: bytes) -> Dict[str, bytes]:
+        """Create the image sizes from an opened Pillow image"""
+        processed_images = {}
+        
+        is_jpeg = source.format == 'JPEG'
+        img = self._to_oriented_rgb(source)
+            
+        # Original (potentially compressed)
+        original_buffer = BytesIO()
+        img.save(original_buffer, format='JPEG', quality=90, optimize=True)
+        processed_images['original'] = original_buffer.getvalue()
+            
+        if is_jpeg:
+            # Decode the smaller sizes at 1/2, 1/4 or 1/8 scale straight from the
+            # DCT coefficients instead of downscaling the full-resolution pixels
+            with Image.open(BytesIO(file_data)) as draft_source:
+                draft_source.draft('RGB', self.MEDIUM_SIZE)
+                medium_img = self._to_oriented_rgb(draft_source)
+        else:
+            medium_img = img.copy()
+            
+        # Medium size (reducing_gap does a fast box reduce before the LANCZOS pass)
+        medium_img.thumbnail(self.MEDIUM_SIZE, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        medium_buffer = BytesIO()
+        medium_img.save(medium_buffer, format='JPEG', quality=85, optimize=True)
+        processed_images['medium'] = medium_buffer.getvalue()
+            
+        # Thumbnail, derived from the medium image rather than the full-size original
+        thumb_img = medium_img.copy()
+        thumb_img.thumbnail(self.THUMBNAIL_SIZE, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        thumb_buffer = BytesIO()
+        thumb_img.save(thumb_buffer, format='JPEG', quality=80, optimize=True)
+        processed_images['thumbnail'] = thumb_buffer.getvalue()
+            
+        return processed_images
+    
+    def _to_oriented_rgb(self, img: Image.Image) -> Image.Image:
+        """Convert to RGB (flattening transparency onto white) and apply EXIF orientation"""
+        # Convert to RGB if necessary (for PNG with transparency)
+        if img.mode in ('RGBA', 'LA', 'P'):
+            # Create white background
+            background = Image.new('RGB', img.size, (255, 255, 255))
+            if img.mode == 'P':
+                img = img.convert('RGBA')
+            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+            img = background
+        elif img.mode != 'RGB':
+            img = img.convert('RGB')
+        
+        # Apply EXIF orientation
+        return ImageOps.exif_transpose(img)
+    
     def generate_upload_url(self, filename: str, content_type: str, user_id: str) -> Dict[str, str]:
         """
         Generate presigned URL for direct S3 upload
@@ -218,6 +377,7 @@ class ImageService:
         uploaded_keys = {}
         
         try:
+            futures = {}
             for size, image_data in processed_images.items():
                 # Create key for this size
                 key_parts = base_key.rsplit('.', 1)
@@ -226,15 +386,12 @@ class ImageService:
                 else:
                     s3_key = f"{base_key}_{size}"
                 
-                # Upload to S3
-                self.s3_client.put_object(
-                    Bucket=self.bucket_name,
-                    Key=s3_key,
-                    Body=image_data,
-                    ContentType='image/jpeg',
-                    CacheControl='max-age=31536000'  # 1 year cache
-                )
-                
+                # Upload to S3 (all sizes in parallel)
+                future = _upload_executor.submit(self._upload_object, s3_key, image_data)
+                futures[size] = (s3_key, future)
+            
+            for size, (s3_key, future) in futures.items():
+                future.result()
                 uploaded_keys[size] = s3_key
                 logger.info(f"Uploaded {size} image to {s3_key}")
             
@@ -244,7 +401,29 @@ class ImageService:
             logger.error(f"Failed to upload processed images: {e}")
             raise ValidationError("画像のアップロードに失敗しました。")
     
-    def get_image_url(self, s3_key: str, expires_in: int = 3600) -> str:
+    def _upload_object(self, s3_key: str, image_data: bytes):
+        """Upload one image, using multipart for bodies above the transfer threshold"""
+        if len(image_data) >= _transfer_config.multipart_threshold:
+            self.s3_client.upload_fileobj(
+                BytesIO(image_data),
+                self.bucket_name,
+                s3_key,
+                Config=_transfer_config,
+                ExtraArgs={
+                    'ContentType': 'image/jpeg',
+                    'CacheControl': 'max-age=31536000'  # 1 year cache
+                }
+            )
+        else:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                Body=image_data,
+                ContentType='image/jpeg',
+                CacheControl='max-age=31536000'  # 1 year cache
+            )
+    
+    def get_image_url(self, s3_key: str, expires_in: int = DEFAULT_URL_EXPIRES_IN) -> str:
         """
         Generate presigned URL for image access
         
@@ -255,8 +434,14 @@ class ImageService:
         Returns:
             Presigned URL for image access
         """
+        cacheable = expires_in == self.DEFAULT_URL_EXPIRES_IN
+        if cacheable:
+            cached_url = self._url_cache.get(s3_key)
+            if cached_url is not None:
+                return cached_url
+        
         try:
-            return self.s3_client.generate_presigned_url(
+            url = self.s3_client.generate_presigned_url(
                 'get_object',
                 Params={'Bucket': self.bucket_name, 'Key': s3_key},
                 ExpiresIn=expires_in
@@ -264,6 +449,10 @@ class ImageService:
         except Exception as e:
             logger.error(f"Failed to generate image URL for {s3_key}: {e}")
             return ""
+        
+        if cacheable:
+            self._url_cache.set(s3_key, url)
+        return url
     
     def delete_image(self, s3_key: str) -> bool:
         """
@@ -277,6 +466,7 @@ class ImageService:
         """
         try:
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
+            self._url_cache.invalidate(s3_key)
             logger.info(f"Deleted image: {s3_key}")
             return True
         except Exception as e:
@@ -1,6 +1,7 @@
 """
 Interaction service for handling likes and comments
 """
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Optional
 from .models import Interaction, Post, User
 from .error_handler import ValidationError, NotFoundError
@@ -10,134 +11,155 @@ from botocore.exceptions import ClientError
 
 logger = get_logger(__name__)
 
+# Runs independent DynamoDB reads alongside the request thread (boto3 clients are thread-safe)
+_lookup_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='interaction-lookup')
+
 class InteractionService:
     """Service for managing post interactions (likes and comments)"""
     
+    @monitor_database_operation('toggle_like', 'interactions')
     def toggle_like(self, user_id: str, post_id: str) -> Dict[str, Any]:
         """
         Toggle like for a post using DynamoDB conditional updates to avoid race conditions
         Returns the new like status and updated count
         """
-        @monitor_database_operation('toggle_like', 'interactions')
-        def _toggle_like():
-            # Validate post exists
-            post = Post.get_by_id(post_id)
-            if not post:
-                raise NotFoundError("投稿が見つかりません")
+        # Likes stored under the old timestamped key are looked up while the post is read
+        legacy_future = _lookup_executor.submit(Interaction.get_legacy_likes, post_id, user_id)
+        
+        # Validate post exists
+        post = Post.get_by_id(post_id)
+        if not post:
+            raise NotFoundError("投稿が見つかりません")
+        
+        like = Interaction(
+            post_id=post_id,
+            user_id=user_id,
+            interaction_type='like'
+        )
+        
+        # A legacy like means the user has already liked the post: unlike it (and any
+        # duplicate written under the current key) instead of adding a second like
+        legacy_likes = legacy_future.result()
+        if legacy_likes:
+            likes_count = None
+            for existing in legacy_likes + [like]:
+                count = existing.delete_with_count()
+                if count is not None:
+                    likes_count = count
+            post.likes_count = (likes_count if likes_count is not None
+                                else Post.get_stored_count(post_id, 'likes_count'))
             
-            # Check if user has already liked this post
-            existing_like = Interaction.get_user_like(post_id, user_id)
-            
-            if existing_like:
-                # Unlike: Remove the like and decrement count
-                Interaction.delete_like(post_id, user_id)
-                post.update_counts(likes_delta=-1)
-                
-                logger.info(f"User {user_id} unliked post {post_id}")
-                return {
-                    'liked': False,
-                    'likes_count': post.likes_count,
-                    'message': 'いいねを取り消しました'
-                }
-            else:
-                # Like: Add the like and increment count
-                like = Interaction(
-                    post_id=post_id,
-                    user_id=user_id,
-                    interaction_type='like'
-                )
-                like.save()
-                post.update_counts(likes_delta=1)
-                
-                logger.info(f"User {user_id} liked post {post_id}")
-                return {
-                    'liked': True,
-                    'likes_count': post.likes_count,
-                    'message': 'いいねしました'
-                }
+            logger.info("User %s unliked post %s (legacy like)", user_id, post_id)
+            return {
+                'liked': False,
+                'likes_count': post.likes_count,
+                'message': 'いいねを取り消しました'
+            }
+        
+        # Like: conditionally add the like and increment the count in one transaction;
+        # it only fails if the user has already liked the post; counts returned to the client
+        # are the stored values after the write, not the (possibly stale) cached post's
+        likes_count = like.save_with_count(only_if_new=True)
+        if likes_count is not None:
+            post.likes_count = likes_count
+            
+            logger.info("User %s liked post %s", user_id, post_id)
+            return {
+                'liked': True,
+                'likes_count': post.likes_count,
+                'message': 'いいねしました'
+            }
         
-        return _toggle_like()
+        # Unlike: conditionally remove the like and decrement count in one transaction
+        # (if a concurrent request already removed it, the count was decremented there)
+        likes_count = like.delete_with_count()
+        post.likes_count = (likes_count if likes_count is not None
+                            else Post.get_stored_count(post_id, 'likes_count'))
+        
+        logger.info("User %s unliked post %s", user_id, post_id)
+        return {
+            'liked': False,
+            'likes_count': post.likes_count,
+            'message': 'いいねを取り消しました'
+        }
     
+    @monitor_database_operation('add_comment', 'interactions')
     def add_comment(self, user_id: str, post_id: str, content: str) -> Dict[str, Any]:
         """
         Add a comment to a post
         """
-        @monitor_database_operation('add_comment', 'interactions')
-        def _add_comment():
-            # Validate input
-            if not content or not content.strip():
-                raise ValidationError("コメント内容が必要です")
-            
-            trimmed_content = content.strip()
-            if len(trimmed_content) > 500:  # Limit comment length
-                raise ValidationError("コメントは500文字以内で入力してください")
-            
-            # Validate post exists
-            post = Post.get_by_id(post_id)
-            if not post:
-                raise NotFoundError("投稿が見つかりません")
-            
-            # Validate user exists
-            user = User.get_by_id(user_id)
-            if not user:
-                raise NotFoundError("ユーザーが見つかりません")
-            
-            # Create comment
-            comment = Interaction(
-                post_id=post_id,
-                user_id=user_id,
-                interaction_type='comment',
-                content=trimmed_content
-            )
-            comment.save()
-            
-            # Update post comment count
-            post.update_counts(comments_delta=1)
-            
-            logger.info(f"User {user_id} commented on post {post_id}")
-            
-            # Return comment data with user info
-            return {
-                'comment': {
-                    'interaction_id': comment.interaction_id,
-                    'post_id': comment.post_id,
-                    'user_id': comment.user_id,
-                    'username': user.username,
-                    'content': comment.content,
-                    'created_at': comment.created_at
-                },
-                'comments_count': post.comments_count,
-                'message': 'コメントを投稿しました'
-            }
+        # Validate input
+        if not content or not content.strip():
+            raise ValidationError("コメント内容が必要です")
+        
+        trimmed_content = content.strip()
+        if len(trimmed_content) > 500:  # Limit comment length
+            raise ValidationError("コメントは500文字以内で入力してください")
+        
+        # Validate post and user exist (both reads in parallel)
+        user_future = _lookup_executor.submit(User.get_profile_summary, user_id)
+        post = Post.get_by_id(post_id)
+        if not post:
+            raise NotFoundError("投稿が見つかりません")
+        
+        user = user_future.result()
+        if not user:
+            raise NotFoundError("ユーザーが見つかりません")
+        
+        # Create comment
+        comment = Interaction(
+            post_id=post_id,
+            user_id=user_id,
+            interaction_type='comment',
+            content=trimmed_content
+        )
+        # Save comment and update post comment count atomically
+        post.comments_count = comment.save_with_count()
         
-        return _add_comment()
+        logger.info("User %s commented on post %s", user_id, post_id)
+        
+        # Return comment data with user info
+        return {
+            'comment': {
+                'interaction_id': comment.interaction_id,
+                'post_id': comment.post_id,
+                'user_id': comment.user_id,
+                'username': user['username'],
+                'content': comment.content,
+                'created_at': comment.created_at
+            },
+            'comments_count': post.comments_count,
+            'message': 'コメントを投稿しました'
+        }
     
     def get_post_likes(self, post_id: str, limit: int = 50) -> Dict[str, Any]:
         """
         Get likes for a post
         """
         try:
-            # Validate post exists
-            post = Post.get_by_id(post_id)
-            if not post:
-                raise NotFoundError("投稿が見つかりません")
-            
-            # Get likes
+            # Get likes while the post is validated in parallel
+            post_future = _lookup_executor.submit(Post.get_by_id, post_id)
             likes = Interaction.get_post_interactions(
                 post_id=post_id,
                 interaction_type='like',
                 limit=limit
             )
             
-            # Get user info for each like
+            # Validate post exists
+            post = post_future.result()
+            if not post:
+                raise NotFoundError("投稿が見つかりません")
+            
+            # Get user info for all likes in one batch
+            users = User.batch_get_by_ids({like.user_id for like in likes})
             likes_with_users = []
             for like in likes:
-                user = User.get_by_id(like.user_id)
+                user = users.get(like.user_id)
                 if user:
                     likes_with_users.append({
-                        'user_id': user.user_id,
-                        'username': user.username,
-                        'profile_image': user.profile_image,
+                        'user_id': user['user_id'],
+                        'username': user['username'],
+                        'profile_image': user.get('profile_image'),
                         'created_at': like.created_at
                     })
             
@@ -148,7 +170,7 @@ class InteractionService:
             }
             
         except Exception as e:
-            logger.error(f"Failed to get likes for post {post_id}: {e}")
+            logger.error("Failed to get likes for post %s: %s", post_id, e)
             raise
     
     def get_post_comments(self, post_id: str, limit: int = 50) -> Dict[str, Any]:
@@ -156,33 +178,36 @@ class InteractionService:
         Get comments for a post
         """
         try:
-            # Validate post exists
-            post = Post.get_by_id(post_id)
-            if not post:
-                raise NotFoundError("投稿が見つかりません")
-            
-            # Get comments
+            # Get comments (in sort key order) while the post is validated in parallel
+            post_future = _lookup_executor.submit(Post.get_by_id, post_id)
             comments = Interaction.get_post_interactions(
                 post_id=post_id,
                 interaction_type='comment',
                 limit=limit
             )
             
-            # Get user info for each comment
+            # Validate post exists
+            post = post_future.result()
+            if not post:
+                raise NotFoundError("投稿が見つかりません")
+            
+            # Get user info for all comments in one batch
+            users = User.batch_get_by_ids({comment.user_id for comment in comments})
             comments_with_users = []
             for comment in comments:
-                user = User.get_by_id(comment.user_id)
+                user = users.get(comment.user_id)
                 if user:
                     comments_with_users.append({
                         'interaction_id': comment.interaction_id,
-                        'user_id': user.user_id,
-                        'username': user.username,
-                        'profile_image': user.profile_image,
+                        'user_id': user['user_id'],
+                        'username': user['username'],
+                        'profile_image': user.get('profile_image'),
                         'content': comment.content,
                         'created_at': comment.created_at
                     })
             
-            # Sort comments by creation time (oldest first)
+            # Sort by created_at (oldest first); comments stored before the sort key led with
+            # the timestamp (comment#{user_id}#{timestamp}) are not in time order by key
             comments_with_users.sort(key=lambda x: x['created_at'])
             
             return {
@@ -192,7 +217,7 @@ class InteractionService:
             }
             
         except Exception as e:
-            logger.error(f"Failed to get comments for post {post_id}: {e}")
+            logger.error("Failed to get comments for post %s: %s", post_id, e)
             raise
     
     def get_user_like_status(self, user_id: str, post_id: str) -> bool:
@@ -204,7 +229,7 @@ class InteractionService:
             return like is not None
             
         except Exception as e:
-            logger.error(f"Failed to get like status for user {user_id}, post {post_id}: {e}")
+            logger.error("Failed to get like status for user %s, post %s: %s", user_id, post_id, e)
             return False
     
     def delete_comment(self, user_id: str, post_id: str, interaction_id: str) -> Dict[str, Any]:
@@ -212,30 +237,28 @@ class InteractionService:
         Delete a comment (only by the comment author)
         """
         try:
-            # Get the comment
-            comments = Interaction.get_post_interactions(post_id, 'comment')
-            comment = None
-            for c in comments:
-                if c.interaction_id == interaction_id:
-                    comment = c
-                    break
-            
-            if not comment:
+            # Get the comment by primary key while the post is fetched in parallel
+            post_future = _lookup_executor.submit(Post.get_by_id, post_id)
+            comment = Interaction.get_by_id(post_id, interaction_id)
+            
+            if not comment or comment.interaction_type != 'comment':
                 raise NotFoundError("コメントが見つかりません")
             
             # Check if user is the author
             if comment.user_id != user_id:
                 raise ValidationError("自分のコメントのみ削除できます")
             
-            # Delete comment
-            comment.delete()
-            
-            # Update post comment count
-            post = Post.get_by_id(post_id)
+            # Delete comment and update post comment count atomically
+            # (a comment left behind by a deleted post has no count to update)
+            post = post_future.result()
             if post:
-                post.update_counts(comments_delta=-1)
+                comments_count = comment.delete_with_count()
+                post.comments_count = (comments_count if comments_count is not None
+                                       else Post.get_stored_count(post_id, 'comments_count'))
+            else:
+                comment.delete()
             
-            logger.info(f"User {user_id} deleted comment {interaction_id}")
+            logger.info("User %s deleted comment %s", user_id, interaction_id)
             
             return {
                 'message': 'コメントを削除しました',
@@ -243,7 +266,7 @@ class InteractionService:
             }
             
         except Exception as e:
-            logger.error(f"Failed to delete comment {interaction_id}: {e}")
+            logger.error("Failed to delete comment %s: %s", interaction_id, e)
             raise
 
 
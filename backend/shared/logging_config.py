@@ -4,14 +4,95 @@
 """
 import logging
 import logging.config
+import logging.handlers
 import os
 import sys
 import json
-import uuid
+import secrets
 import time
+import itertools
+import queue
+import atexit
+import re
+import copy
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+# orjson が利用可能な場合は C 実装でシリアライズ（未インストール時は標準 json）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Flask / X-Ray はレコード毎に import せず、起動時に一度だけ解決
+try:
+    from flask import request as _flask_request, g as _flask_g, session as _flask_session, has_request_context
+    FLASK_AVAILABLE = True
+except ImportError:
+    FLASK_AVAILABLE = False
+
+try:
+    from aws_xray_sdk.core import xray_recorder as _xray_recorder
+    XRAY_AVAILABLE = True
+except ImportError:
+    XRAY_AVAILABLE = False
+
+# パフォーマンス情報は WARNING 以上、または N 件に1回だけ付与（毎レコードの syscall を避ける）
+PERFORMANCE_SAMPLE_EVERY = max(1, int(os.getenv('LOG_PERFORMANCE_SAMPLE_EVERY', '100')))
+_log_counter = itertools.count()
+
+# リクエスト外のログ用 ID: プロセス毎のランダムな接頭辞 + 連番（レコード毎に乱数を生成しない）
+_LOG_ID_NONCE = secrets.token_hex(4)
+_log_id_counter = itertools.count()
+
+def _next_log_id() -> str:
+    """ログ用リクエストIDを生成（連番は折り返さないためプロセス内で重複しない）"""
+    return f"{_LOG_ID_NONCE}-{next(_log_id_counter):x}"
+
+def _reseed_log_ids():
+    """fork 後の子プロセスで接頭辞を振り直す"""
+    global _LOG_ID_NONCE, _log_id_counter
+    _LOG_ID_NONCE = secrets.token_hex(4)
+    _log_id_counter = itertools.count()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reseed_log_ids)
+
+# ログタイムスタンプ: 秒までの ISO 文字列を (秒, 文字列) のタプルでキャッシュし、マイクロ秒だけ付け足す
+_ts_cache = (None, "")
+
+def _iso_timestamp(created: float) -> str:
+    """LogRecord.created を UTC の ISO 8601 文字列（マイクロ秒精度）に変換"""
+    global _ts_cache
+    seconds = int(created)
+    cached_seconds, prefix = _ts_cache
+    if seconds != cached_seconds:
+        prefix = datetime.utcfromtimestamp(seconds).isoformat()
+        _ts_cache = (seconds, prefix)
+    return f"{prefix}.{int((created - seconds) * 1_000_000):06d}"
+
+# psutil.Process はプロセス毎に一度だけ生成（psutil 自体も最初のサンプリング時に import）
+_psutil = None  # import 失敗時は False
+_process = None
+
+def _get_process():
+    """psutil モジュールと現在プロセスのハンドルを取得（psutil が無い場合は (None, None)）"""
+    global _psutil, _process
+    if _psutil is False:
+        return None, None
+    
+    pid = os.getpid()
+    if _process is None or _process.pid != pid:
+        try:
+            import psutil
+            _psutil = psutil
+            _process = psutil.Process(pid)
+        except Exception:
+            _psutil = False
+            return None, None
+    return _psutil, _process
+
 def setup_logging():
     """強化されたログ設定をセットアップ"""
     
@@ -69,7 +150,7 @@ def setup_logging():
                 'filters': ['context']
             },
             'app_file': {
-                'class': 'logging.handlers.RotatingFileHandler',
+                'class': 'backend.shared.logging_config.BytesRotatingFileHandler',
                 'level': log_level,
                 'formatter': 'json',
                 'filename': app_log_file,
@@ -79,7 +160,7 @@ def setup_logging():
                 'filters': ['context']
             },
             'error_file': {
-                'class': 'logging.handlers.RotatingFileHandler',
+                'class': 'backend.shared.logging_config.BytesRotatingFileHandler',
                 'level': 'ERROR',
                 'formatter': 'json',
                 'filename': error_log_file,
@@ -89,7 +170,7 @@ def setup_logging():
                 'filters': ['context']
             },
             'security_file': {
-                'class': 'logging.handlers.RotatingFileHandler',
+                'class': 'backend.shared.logging_config.BytesRotatingFileHandler',
                 'level': 'WARNING',
                 'formatter': 'security',
                 'filename': security_log_file,
@@ -99,7 +180,7 @@ def setup_logging():
                 'filters': ['context', 'security']
             },
             'performance_file': {
-                'class': 'logging.handlers.RotatingFileHandler',
+                'class': 'backend.shared.logging_config.BytesRotatingFileHandler',
                 'level': 'INFO',
                 'formatter': 'json',
                 'filename': performance_log_file,
@@ -151,6 +232,9 @@ def setup_logging():
     # ログ設定を適用
     logging.config.dictConfig(logging_config)
     
+    # ファイル出力はキュー経由でバックグラウンドスレッドに任せる
+    _move_file_handlers_to_queues(['', 'security', 'performance'])
+    
     # 初期化ログ
     logger = logging.getLogger(__name__)
     logger.info(f"Enhanced logging configured", extra={
@@ -166,24 +250,110 @@ def setup_logging():
     
     return logger
 
+# ファイルハンドラーへの書き込みを担うリスナー（バックグラウンドスレッド）
+_queue_listeners = []
+
+def _stop_queue_listeners():
+    """キューに残ったログを書き出してリスナーを停止"""
+    while _queue_listeners:
+        _queue_listeners.pop().stop()
+
+atexit.register(_stop_queue_listeners)
+
+def _move_file_handlers_to_queues(logger_names):
+    """
+    ロガーのファイルハンドラーを QueueHandler に置き換え、ディスク I/O をリクエストスレッドから外す
+    
+    フィルターとフォーマッターはリクエストコンテキストを参照するため、QueueHandler 側
+    （呼び出し元スレッド）で実行し、ファイルハンドラーは整形済みメッセージを書き込むだけにする。
+    """
+    _stop_queue_listeners()
+    
+    # error_file のように複数ロガーで共有されるハンドラーは同じ QueueHandler に置き換える
+    queue_handlers = {}
+    for name in logger_names:
+        target_logger = logging.getLogger(name or None)
+        for index, handler in enumerate(target_logger.handlers):
+            if not isinstance(handler, logging.FileHandler):
+                continue
+            
+            queue_handler = queue_handlers.get(handler)
+            if queue_handler is None:
+                log_queue = queue.SimpleQueue()
+                if isinstance(handler, BytesRotatingFileHandler):
+                    queue_handler = BytesQueueHandler(log_queue)
+                else:
+                    queue_handler = logging.handlers.QueueHandler(log_queue)
+                queue_handler.setLevel(handler.level)
+                queue_handler.setFormatter(handler.formatter)
+                for log_filter in handler.filters:
+                    queue_handler.addFilter(log_filter)
+                
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                handler.filters = []
+                
+                listener = logging.handlers.QueueListener(log_queue, handler)
+                listener.start()
+                _queue_listeners.append(listener)
+                queue_handlers[handler] = queue_handler
+            
+            target_logger.handlers[index] = queue_handler
+
 class EnhancedJSONFormatter(logging.Formatter):
     """強化されたJSON構造化ログフォーマッター"""
     
+    # 追加フィールドとして出力しない LogRecord の標準属性
+    _EXCLUDED_KEYS = frozenset({
+        'name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 
+        'filename', 'module', 'lineno', 'funcName', 'created', 
+        'msecs', 'relativeCreated', 'thread', 'threadName', 
+        'processName', 'process', 'getMessage', 'exc_info', 
+        'exc_text', 'stack_info'
+    })
+    
+    def __init__(self, *args, min_enrich_level=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 実行環境はプロセス中で変わらないため、レコード毎に環境変数を参照しない
+        self._environment = os.getenv('FLASK_ENV', 'development')
+        
+        # このレベル未満のレコードにはリクエスト・パフォーマンス・トレース情報を付与しない
+        level = min_enrich_level or os.getenv('LOG_ENRICH_LEVEL', 'INFO')
+        if isinstance(level, str):
+            level = logging.getLevelName(level.upper())
+        self.min_enrich_level = level if isinstance(level, int) else logging.INFO
+    
     def format(self, record):
         """ログレコードを構造化JSONとしてフォーマット"""
+        return self.format_bytes(record).decode('utf-8')
+    
+    def format_bytes(self, record) -> bytes:
+        """ログレコードを UTF-8 の JSON バイト列としてフォーマット（orjson の出力をそのまま返す）"""
+        log_entry = self._build_entry(record)
+        
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.dumps(log_entry, default=str, option=orjson.OPT_NON_STR_KEYS)
+            except (TypeError, orjson.JSONEncodeError):
+                # 64bit を超える整数など orjson が扱えない値は標準 json で出力
+                pass
+        
+        return json.dumps(log_entry, ensure_ascii=False, default=str, separators=(',', ':')).encode('utf-8')
+    
+    def _build_entry(self, record) -> Dict[str, Any]:
+        """ログレコードから構造化ログエントリを組み立て"""
         
         # ベースログエントリ
         log_entry = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': _iso_timestamp(record.created),
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
             'module': record.module,
             'function': record.funcName,
             'line': record.lineno,
-            'process_id': os.getpid(),
+            'process_id': record.process,
             'thread_id': record.thread,
-            'environment': os.getenv('FLASK_ENV', 'development')
+            'environment': self._environment
         }
         
         # 例外情報の追加
@@ -194,23 +364,38 @@ class EnhancedJSONFormatter(logging.Formatter):
                 'traceback': self.formatException(record.exc_info)
             }
         
-        # パフォーマンス情報の追加
-        try:
-            import psutil
-            process = psutil.Process()
-            log_entry['performance'] = {
-                'memory_usage_mb': round(process.memory_info().rss / 1024 / 1024, 2),
-                'cpu_percent': psutil.cpu_percent()
-            }
-        except Exception:
-            pass
+        # リクエスト・パフォーマンス・トレース情報の追加（重い処理のため対象レベル以上のみ）
+        if record.levelno >= self.min_enrich_level:
+            self._add_enrichment(record, log_entry)
+        
+        # 追加フィールドの処理（標準属性との差集合で抽出し、値が None のものは出力しない）
+        record_dict = record.__dict__
+        extra_keys = record_dict.keys() - self._EXCLUDED_KEYS
+        if extra_keys:
+            extra_fields = {key: record_dict[key] for key in extra_keys if record_dict[key] is not None}
+            if extra_fields:
+                log_entry['extra'] = extra_fields
+        
+        return log_entry
+    
+    def _add_enrichment(self, record, log_entry: Dict[str, Any]):
+        """パフォーマンス・リクエストコンテキスト・X-Ray トレース情報を追加"""
+        
+        # パフォーマンス情報の追加（WARNING 以上、またはサンプリング対象のレコードのみ）
+        if record.levelno >= logging.WARNING or next(_log_counter) % PERFORMANCE_SAMPLE_EVERY == 0:
+            psutil, process = _get_process()
+            if process is not None:
+                log_entry['performance'] = {
+                    'memory_usage_mb': round(process.memory_info().rss / 1024 / 1024, 2),
+                    'cpu_percent': psutil.cpu_percent()
+                }
         
         # リクエストコンテキスト情報の追加
-        try:
-            from flask import request, g
-            if request:
+        if FLASK_AVAILABLE and has_request_context():
+            request = _flask_request
+            try:
                 log_entry['request'] = {
-                    'id': getattr(g, 'request_id', None),
+                    'id': getattr(_flask_g, 'request_id', None),
                     'method': request.method,
                     'path': request.path,
                     'remote_addr': request.remote_addr,
@@ -226,36 +411,77 @@ class EnhancedJSONFormatter(logging.Formatter):
                         'username': request.current_user.username
                     }
                     
-        except (ImportError, RuntimeError):
-            pass
-        
-        # 追加フィールドの処理
-        extra_fields = {}
-        excluded_keys = {
-            'name', 'msg', 'args', 'levelname', 'levelno', 'pathname', 
-            'filename', 'module', 'lineno', 'funcName', 'created', 
-            'msecs', 'relativeCreated', 'thread', 'threadName', 
-            'processName', 'process', 'getMessage', 'exc_info', 
-            'exc_text', 'stack_info'
-        }
-        
-        for key, value in record.__dict__.items():
-            if key not in excluded_keys:
-                extra_fields[key] = value
-        
-        if extra_fields:
-            log_entry['extra'] = extra_fields
+            except RuntimeError:
+                pass
         
         # X-Ray トレース情報の追加
+        if XRAY_AVAILABLE:
+            try:
+                trace_id = _xray_recorder.current_trace_id()
+                if trace_id:
+                    log_entry['trace_id'] = trace_id
+            except Exception:
+                pass
+
+class BytesRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    バイナリモードで書き込むローテーションファイルハンドラー
+    
+    フォーマッターが format_bytes を持つ場合はそのバイト列をそのまま書き込み、
+    str への変換とストリームでの再エンコードを省く。
+    """
+    
+    def _open(self):
+        return open(self.baseFilename, 'ab')
+    
+    def format_bytes(self, record) -> bytes:
+        """改行を含まないログ1行分のバイト列を取得"""
+        # QueueHandler で整形済みのレコード
+        if isinstance(record.msg, bytes):
+            return record.msg
+        formatter = self.formatter
+        if formatter is not None and hasattr(formatter, 'format_bytes'):
+            return formatter.format_bytes(record)
+        return self.format(record).encode('utf-8')
+    
+    def shouldRollover(self, record, data: bytes = None) -> bool:
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0:
+            if data is None:
+                data = self.format_bytes(record)
+            self.stream.seek(0, 2)
+            if self.stream.tell() + len(data) + 1 >= self.maxBytes:
+                return True
+        return False
+    
+    def emit(self, record):
         try:
-            from aws_xray_sdk.core import xray_recorder
-            trace_id = xray_recorder.current_trace_id()
-            if trace_id:
-                log_entry['trace_id'] = trace_id
+            data = self.format_bytes(record)
+            if self.shouldRollover(record, data):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(data + b'\n')
+            self.stream.flush()
         except Exception:
-            pass
+            self.handleError(record)
+
+class BytesQueueHandler(logging.handlers.QueueHandler):
+    """format_bytes を持つフォーマッターの出力をバイト列のままキューに渡す QueueHandler"""
+    
+    def prepare(self, record):
+        formatter = self.formatter
+        if formatter is None or not hasattr(formatter, 'format_bytes'):
+            return super().prepare(record)
         
-        return json.dumps(log_entry, ensure_ascii=False, default=str, separators=(',', ':'))
+        data = formatter.format_bytes(record)
+        record = copy.copy(record)
+        record.msg = data
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return record
 
 class EnhancedContextFilter(logging.Filter):
     """強化されたコンテキスト情報フィルター"""
@@ -264,55 +490,62 @@ class EnhancedContextFilter(logging.Filter):
         """ログレコードにコンテキスト情報を追加"""
         
         # リクエストIDの追加
-        try:
-            from flask import g
-            if hasattr(g, 'request_id'):
-                record.request_id = g.request_id
+        if FLASK_AVAILABLE and has_request_context():
+            if hasattr(_flask_g, 'request_id'):
+                record.request_id = _flask_g.request_id
             else:
-                record.request_id = str(uuid.uuid4())[:8]
-                g.request_id = record.request_id
-        except (ImportError, RuntimeError):
-            record.request_id = str(uuid.uuid4())[:8]
-        
-        # セッション情報の追加
-        try:
-            from flask import session
-            if session:
-                record.session_id = session.get('session_id', 'anonymous')
-        except (ImportError, RuntimeError):
+                record.request_id = _next_log_id()
+                _flask_g.request_id = record.request_id
+            
+            # セッション情報の追加
+            try:
+                if _flask_session:
+                    record.session_id = _flask_session.get('session_id', 'anonymous')
+            except RuntimeError:
+                record.session_id = 'anonymous'
+        else:
+            record.request_id = _next_log_id()
             record.session_id = 'anonymous'
         
         # タイムスタンプの追加
-        record.timestamp_ms = int(time.time() * 1000)
+        record.timestamp_ms = time.time_ns() // 1_000_000
         
         return True
 
+def _keyword_pattern(keywords):
+    """キーワードのいずれかを含むか（部分一致・大文字小文字無視）を1回の走査で判定する正規表現"""
+    return re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE)
+
+def _record_message(record) -> str:
+    """引数の無いレコードは整形せずにメッセージ本文をそのまま使う"""
+    if not record.args and isinstance(record.msg, str):
+        return record.msg
+    return record.getMessage()
+
 class SecurityFilter(logging.Filter):
     """セキュリティ関連ログフィルター"""
     
+    security_pattern = _keyword_pattern([
+        'security', 'auth', 'login', 'logout', 'unauthorized', 
+        'forbidden', 'csrf', 'xss', 'injection', 'attack',
+        'suspicious', 'blocked', 'rate_limit'
+    ])
+    
     def filter(self, record):
         """セキュリティ関連ログのみを通す"""
-        security_keywords = [
-            'security', 'auth', 'login', 'logout', 'unauthorized', 
-            'forbidden', 'csrf', 'xss', 'injection', 'attack',
-            'suspicious', 'blocked', 'rate_limit'
-        ]
-        
-        message = record.getMessage().lower()
-        return any(keyword in message for keyword in security_keywords)
+        return self.security_pattern.search(_record_message(record)) is not None
 
 class PerformanceFilter(logging.Filter):
     """パフォーマンス関連ログフィルター"""
     
+    performance_pattern = _keyword_pattern([
+        'performance', 'slow', 'timeout', 'memory', 'cpu',
+        'execution_time', 'response_time', 'query_time'
+    ])
+    
     def filter(self, record):
         """パフォーマンス関連ログのみを通す"""
-        performance_keywords = [
-            'performance', 'slow', 'timeout', 'memory', 'cpu',
-            'execution_time', 'response_time', 'query_time'
-        ]
-        
-        message = record.getMessage().lower()
-        return any(keyword in message for keyword in performance_keywords)
+        return self.performance_pattern.search(_record_message(record)) is not None
 
 def get_logger(name: str = None) -> logging.Logger:
     """設定済みロガーインスタンスを取得"""
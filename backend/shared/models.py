@@ -1,24 +1,32 @@
 """
 DynamoDB model classes for photo sharing app
 """
+import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from botocore.exceptions import ClientError
 from .logging_config import get_logger
-from .dynamodb import db_connection
+from .dynamodb import db_connection, timeline_bucket_for
+from .cache import user_cache, user_item_cache, post_cache
 
 logger = get_logger(__name__)
 
+# Runs independent index lookups alongside the calling thread (boto3 clients are thread-safe)
+_lookup_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='model-lookup')
+
 class BaseModel:
     """Base model class with common DynamoDB operations"""
     
-    def __init__(self):
-        self.db = db_connection
+    # Models are plain attribute holders; slots keep feed pages of many instances small
+    __slots__ = ()
+    
+    db = db_connection
     
     def _generate_id(self) -> str:
-        """Generate unique ID"""
-        return str(uuid.uuid4())
+        """Generate unique ID (32 hex chars; existing dashed IDs remain valid keys)"""
+        return uuid.uuid4().hex
     
     def _get_timestamp(self) -> str:
         """Get current timestamp in ISO format"""
@@ -28,6 +36,31 @@ class BaseModel:
 class User(BaseModel):
     """User model for DynamoDB Users table"""
     
+    __slots__ = ('user_id', 'username', 'email', 'password_hash', 'profile_image', 'bio', 'created_at')
+    
+    # Attributes User.update may change, with their expression fragments built once
+    # (names are aliased since some, e.g. "email", could collide with reserved words)
+    _UPDATE_FIELDS = ('username', 'email', 'profile_image', 'bio', 'password_hash')
+    _UPDATE_NAMES = {field: f"#{field}" for field in _UPDATE_FIELDS}
+    _UPDATE_VALUES = {field: f":{field}" for field in _UPDATE_FIELDS}
+    _UPDATE_SETS = {field: f"#{field} = :{field}" for field in _UPDATE_FIELDS}
+    
+    # Attributes read by the username/email lookups (login and uniqueness checks); every
+    # profile field is included since login returns the looked-up user's to_dict()
+    _LOOKUP_PROJECTION = 'user_id, username, email, password_hash, profile_image, bio, created_at'
+    
+    # Fixed query parameters for the lookups; only the key value changes per call
+    _BY_USERNAME = {
+        'IndexName': 'username-index',
+        'KeyConditionExpression': 'username = :username',
+        'ProjectionExpression': _LOOKUP_PROJECTION
+    }
+    _BY_EMAIL = {
+        'IndexName': 'email-index',
+        'KeyConditionExpression': 'email = :email',
+        'ProjectionExpression': _LOOKUP_PROJECTION
+    }
+    
     def __init__(self, user_id: str = None, username: str = None, email: str = None, 
                  password_hash: str = None, profile_image: str = None, bio: str = None):
         super().__init__()
@@ -43,18 +76,18 @@ class User(BaseModel):
         """Save user to DynamoDB"""
         from .monitoring import monitor_database_operation
         
+        from .error_handler import DuplicateError
+        
         @monitor_database_operation('user_save', 'users')
         def _save_user():
             table = self.db.get_table('users')
             
-            # Check if username already exists
+            # Check if username and email already exist (both index queries in parallel)
+            email_future = _lookup_executor.submit(self.get_by_email, self.email) if self.email else None
             if self.username and self.get_by_username(self.username):
-                from .error_handler import DuplicateError
                 raise DuplicateError("ユーザー名は既に使用されています", "username")
             
-            # Check if email already exists
-            if self.email and self.get_by_email(self.email):
-                from .error_handler import DuplicateError
+            if email_future and email_future.result():
                 raise DuplicateError("メールアドレスは既に使用されています", "email")
             
             item = {
@@ -71,12 +104,31 @@ class User(BaseModel):
             if self.bio:
                 item['bio'] = self.bio
             
-            table.put_item(Item=item)
+            # Never overwrite an existing user with the same ID
+            try:
+                table.put_item(Item=item, ConditionExpression='attribute_not_exists(user_id)')
+            except ClientError as e:
+                if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                    raise DuplicateError("ユーザーIDは既に使用されています", "user_id")
+                raise
             logger.info(f"User {self.user_id} saved successfully")
             return True
         
         return _save_user()
     
+    @classmethod
+    def _from_item(cls, item: Dict[str, Any]) -> 'User':
+        """Build a user from a DynamoDB item (skips __init__, which would generate an ID and timestamp)"""
+        user = cls.__new__(cls)
+        user.user_id = item['user_id']
+        user.username = item['username']
+        user.email = item['email']
+        user.password_hash = item['password_hash']
+        user.profile_image = item.get('profile_image')
+        user.bio = item.get('bio')
+        user.created_at = item['created_at']
+        return user
+    
     @classmethod
     def get_by_id(cls, user_id: str) -> Optional['User']:
         """Get user by ID"""
@@ -84,48 +136,77 @@ class User(BaseModel):
         
         @monitor_database_operation('user_get_by_id', 'users')
         def _get_user():
-            table = db_connection.get_table('users')
-            response = table.get_item(Key={'user_id': user_id})
-            
-            if 'Item' in response:
-                item = response['Item']
-                user = cls(
-                    user_id=item['user_id'],
-                    username=item['username'],
-                    email=item['email'],
-                    password_hash=item['password_hash'],
-                    profile_image=item.get('profile_image'),
-                    bio=item.get('bio')
-                )
-                user.created_at = item['created_at']
-                return user
+            item = user_item_cache.get(user_id)
+            if item is None:
+                table = db_connection.get_table('users')
+                response = table.get_item(Key={'user_id': user_id})
+                item = response['Item'] if 'Item' in response else None
+                if item is not None:
+                    user_item_cache.set(user_id, item)
+            
+            if item is not None:
+                return cls._from_item(item)
             return None
         
         return _get_user()
     
+    @classmethod
+    def get_many(cls, user_ids: List[str]) -> Dict[str, 'User']:
+        """Get full users for many IDs with BatchGetItem (100 keys per request), keyed by user_id"""
+        from .dynamodb_optimizer import dynamodb_optimizer
+        
+        try:
+            unique_ids = list(dict.fromkeys(user_ids))
+            items = user_item_cache.get_many(unique_ids)
+            missing_ids = [user_id for user_id in unique_ids if user_id not in items]
+            for item in dynamodb_optimizer.batch_get_items('users', 'user_id', missing_ids):
+                items[item['user_id']] = item
+                user_item_cache.set(item['user_id'], item)
+            
+            return {user_id: cls._from_item(item) for user_id, item in items.items()}
+            
+        except Exception as e:
+            logger.error(f"Failed to get {len(user_ids)} users by ID: {e}")
+            raise
+    
+    @classmethod
+    def batch_get_by_ids(cls, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get public attributes (username, profile_image, bio) for many users, keyed by user_id"""
+        from .dynamodb_optimizer import dynamodb_optimizer
+        
+        # BatchGetItem in chunks of 100 keys, serving cached users without a request
+        return dynamodb_optimizer.batch_get_users(list(user_ids))
+    
+    @classmethod
+    def get_profile_summary(cls, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get public attributes (username, profile_image, bio) of one user, or None if not found"""
+        from .dynamodb_optimizer import USER_SUMMARY_PROJECTION
+        
+        summary = user_cache.get(user_id)
+        if summary is None:
+            table = db_connection.get_table('users')
+            response = table.get_item(
+                Key={'user_id': user_id},
+                ProjectionExpression=USER_SUMMARY_PROJECTION
+            )
+            if 'Item' not in response:
+                return None
+            summary = response['Item']
+            user_cache.set(user_id, summary)
+        return summary
+    
     @classmethod
     def get_by_username(cls, username: str) -> Optional['User']:
         """Get user by username"""
         try:
             table = db_connection.get_table('users')
             response = table.query(
-                IndexName='username-index',
-                KeyConditionExpression='username = :username',
+                **cls._BY_USERNAME,
                 ExpressionAttributeValues={':username': username}
             )
             
             if response['Items']:
-                item = response['Items'][0]
-                user = cls(
-                    user_id=item['user_id'],
-                    username=item['username'],
-                    email=item['email'],
-                    password_hash=item['password_hash'],
-                    profile_image=item.get('profile_image'),
-                    bio=item.get('bio')
-                )
-                user.created_at = item['created_at']
-                return user
+                return cls._from_item(response['Items'][0])
             return None
             
         except Exception as e:
@@ -138,23 +219,12 @@ class User(BaseModel):
         try:
             table = db_connection.get_table('users')
             response = table.query(
-                IndexName='email-index',
-                KeyConditionExpression='email = :email',
+                **cls._BY_EMAIL,
                 ExpressionAttributeValues={':email': email}
             )
             
             if response['Items']:
-                item = response['Items'][0]
-                user = cls(
-                    user_id=item['user_id'],
-                    username=item['username'],
-                    email=item['email'],
-                    password_hash=item['password_hash'],
-                    profile_image=item.get('profile_image'),
-                    bio=item.get('bio')
-                )
-                user.created_at = item['created_at']
-                return user
+                return cls._from_item(response['Items'][0])
             return None
             
         except Exception as e:
@@ -166,36 +236,27 @@ class User(BaseModel):
         try:
             table = self.db.get_table('users')
             
-            # Build update expression
-            update_expression = "SET "
-            expression_attribute_values = {}
-            expression_attribute_names = {}
-            
-            for key, value in kwargs.items():
-                if hasattr(self, key) and value is not None:
-                    # Handle reserved keywords
-                    attr_name = f"#{key}"
-                    attr_value = f":{key}"
-                    
-                    update_expression += f"{attr_name} = {attr_value}, "
-                    expression_attribute_names[attr_name] = key
-                    expression_attribute_values[attr_value] = value
-                    
-                    # Update instance attribute
-                    setattr(self, key, value)
-            
-            # Remove trailing comma and space
-            update_expression = update_expression.rstrip(', ')
-            
-            if not expression_attribute_values:
+            # Build update expression from the precomputed fragments
+            fields = [field for field in self._UPDATE_FIELDS if kwargs.get(field) is not None]
+            if not fields:
                 return True  # Nothing to update
             
+            update_expression = "SET " + ", ".join([self._UPDATE_SETS[field] for field in fields])
+            expression_attribute_names = {self._UPDATE_NAMES[field]: field for field in fields}
+            expression_attribute_values = {self._UPDATE_VALUES[field]: kwargs[field] for field in fields}
+            
             table.update_item(
                 Key={'user_id': self.user_id},
                 UpdateExpression=update_expression,
                 ExpressionAttributeNames=expression_attribute_names,
                 ExpressionAttributeValues=expression_attribute_values
             )
+            user_cache.invalidate(self.user_id)
+            user_item_cache.invalidate(self.user_id)
+            
+            # Update instance attributes
+            for field in fields:
+                setattr(self, field, kwargs[field])
             
             logger.info(f"User {self.user_id} updated successfully")
             return True
@@ -209,6 +270,8 @@ class User(BaseModel):
         try:
             table = self.db.get_table('users')
             table.delete_item(Key={'user_id': self.user_id})
+            user_cache.invalidate(self.user_id)
+            user_item_cache.invalidate(self.user_id)
             logger.info(f"User {self.user_id} deleted successfully")
             return True
             
@@ -231,6 +294,8 @@ class User(BaseModel):
 class Post(BaseModel):
     """Post model for DynamoDB Posts table"""
     
+    __slots__ = ('post_id', 'user_id', 'image_key', 'caption', 'likes_count', 'comments_count', 'created_at')
+    
     def __init__(self, post_id: str = None, user_id: str = None, image_key: str = None,
                  caption: str = None, likes_count: int = 0, comments_count: int = 0):
         super().__init__()
@@ -245,22 +310,23 @@ class Post(BaseModel):
     def save(self) -> bool:
         """Save post to DynamoDB"""
         try:
-            table = self.db.get_table('posts')
-            
+            # Item is built directly in AttributeValue format for the low-level client
+            # (skips the Resource layer's per-attribute TypeSerializer pass)
             item = {
-                'post_id': self.post_id,
-                'user_id': self.user_id,
-                'image_key': self.image_key,
-                'likes_count': self.likes_count,
-                'comments_count': self.comments_count,
-                'created_at': self.created_at
+                'post_id': {'S': self.post_id},
+                'user_id': {'S': self.user_id},
+                'image_key': {'S': self.image_key},
+                'likes_count': {'N': str(self.likes_count)},
+                'comments_count': {'N': str(self.comments_count)},
+                'created_at': {'S': self.created_at},
+                'timeline_bucket': {'S': timeline_bucket_for(self.post_id)}
             }
             
             # Add optional caption
             if self.caption:
-                item['caption'] = self.caption
+                item['caption'] = {'S': self.caption}
             
-            table.put_item(Item=item)
+            self.db.client.put_item(TableName=self.db.table_names['posts'], Item=item)
             logger.info(f"Post {self.post_id} saved successfully")
             return True
             
@@ -268,31 +334,62 @@ class Post(BaseModel):
             logger.error(f"Failed to save post {self.post_id}: {e}")
             raise
     
+    @classmethod
+    def _from_item(cls, item: Dict[str, Any]) -> 'Post':
+        """Build a post from a DynamoDB item (skips __init__, which would generate an ID and timestamp)"""
+        post = cls.__new__(cls)
+        post.post_id = item['post_id']
+        post.user_id = item['user_id']
+        post.image_key = item['image_key']
+        post.caption = item.get('caption')
+        post.likes_count = item.get('likes_count', 0)
+        post.comments_count = item.get('comments_count', 0)
+        post.created_at = item['created_at']
+        return post
+    
+    @staticmethod
+    def hydrate_authors(posts: List['Post']) -> Dict[str, 'User']:
+        """Load the authors of many posts with one batch read, keyed by user_id"""
+        return User.get_many([post.user_id for post in posts])
+    
     @classmethod
     def get_by_id(cls, post_id: str) -> Optional['Post']:
-        """Get post by ID"""
+        """Get post by ID (served from the post cache when possible)"""
         try:
-            table = db_connection.get_table('posts')
-            response = table.get_item(Key={'post_id': post_id})
-            
-            if 'Item' in response:
+            item = post_cache.get(post_id)
+            if item is None:
+                table = db_connection.get_table('posts')
+                response = table.get_item(Key={'post_id': post_id})
+                if 'Item' not in response:
+                    return None
                 item = response['Item']
-                post = cls(
-                    post_id=item['post_id'],
-                    user_id=item['user_id'],
-                    image_key=item['image_key'],
-                    caption=item.get('caption'),
-                    likes_count=item.get('likes_count', 0),
-                    comments_count=item.get('comments_count', 0)
-                )
-                post.created_at = item['created_at']
-                return post
-            return None
+                post_cache.set(post_id, item)
+            
+            return cls._from_item(item)
             
         except Exception as e:
             logger.error(f"Failed to get post by ID {post_id}: {e}")
             raise
     
+    @classmethod
+    def get_many(cls, post_ids: List[str]) -> Dict[str, 'Post']:
+        """Get many posts with BatchGetItem (100 keys per request), keyed by post_id"""
+        from .dynamodb_optimizer import dynamodb_optimizer
+        
+        try:
+            unique_ids = list(dict.fromkeys(post_ids))
+            items = post_cache.get_many(unique_ids)
+            missing_ids = [post_id for post_id in unique_ids if post_id not in items]
+            for item in dynamodb_optimizer.batch_get_items('posts', 'post_id', missing_ids):
+                items[item['post_id']] = item
+                post_cache.set(item['post_id'], item)
+            
+            return {post_id: cls._from_item(item) for post_id, item in items.items()}
+            
+        except Exception as e:
+            logger.error(f"Failed to get {len(post_ids)} posts by ID: {e}")
+            raise
+    
     @classmethod
     def get_user_posts(cls, user_id: str, limit: int = 20, last_key: Dict[str, str] = None) -> Dict[str, Any]:
         """Get posts by user with proper DynamoDB pagination"""
@@ -313,18 +410,7 @@ class Post(BaseModel):
             
             response = table.query(**query_params)
             
-            posts = []
-            for item in response['Items']:
-                post = cls(
-                    post_id=item['post_id'],
-                    user_id=item['user_id'],
-                    image_key=item['image_key'],
-                    caption=item.get('caption'),
-                    likes_count=item.get('likes_count', 0),
-                    comments_count=item.get('comments_count', 0)
-                )
-                post.created_at = item['created_at']
-                posts.append(post)
+            posts = [cls._from_item(item) for item in response['Items']]
             
             # Return posts with pagination info
             return {
@@ -339,50 +425,43 @@ class Post(BaseModel):
     
     @classmethod
     def get_timeline_posts(cls, limit: int = 20, last_key: Dict[str, str] = None) -> Dict[str, Any]:
-        """Get timeline posts with proper DynamoDB pagination"""
+        """
+        Get timeline posts (newest first) with proper DynamoDB pagination
+        
+        Queries the sharded timeline-bucket-index GSI (timeline_bucket + created_at) and merges the
+        buckets by created_at; last_key is the per-bucket cursor returned by the previous page.
+        Until TIMELINE_INDEX_ENABLED is set (after the timeline_bucket backfill) the posts table
+        is scanned instead, since older posts are not in the index.
+        """
+        from .dynamodb_optimizer import dynamodb_optimizer
+        
         try:
-            table = db_connection.get_table('posts')
-            
-            # Use scan with proper pagination for timeline
-            # In production, this could be optimized with a GSI using a fixed partition key
-            scan_params = {
-                'Limit': limit,
-                'Select': 'ALL_ATTRIBUTES'
-            }
-            
-            # Handle pagination with proper DynamoDB LastEvaluatedKey
-            if last_key:
-                scan_params['ExclusiveStartKey'] = last_key
-            
-            response = table.scan(**scan_params)
-            
-            posts = []
-            for item in response['Items']:
-                post = cls(
-                    post_id=item['post_id'],
-                    user_id=item['user_id'],
-                    image_key=item['image_key'],
-                    caption=item.get('caption'),
-                    likes_count=item.get('likes_count', 0),
-                    comments_count=item.get('comments_count', 0)
-                )
-                post.created_at = item['created_at']
-                posts.append(post)
+            result = dynamodb_optimizer.optimize_timeline_query(limit=limit, last_key=last_key)
             
-            # Sort by created_at descending (most recent first)
-            posts.sort(key=lambda x: x.created_at, reverse=True)
+            posts = [cls._from_item(item) for item in result['posts']]
             
             # Return posts with pagination info
             return {
                 'posts': posts,
-                'last_evaluated_key': response.get('LastEvaluatedKey'),
-                'has_more': 'LastEvaluatedKey' in response
+                'last_evaluated_key': result['last_evaluated_key'],
+                'has_more': result['has_more']
             }
             
         except Exception as e:
             logger.error(f"Failed to get timeline posts: {e}")
             raise
     
+    @staticmethod
+    def get_stored_count(post_id: str, count_attribute: str) -> int:
+        """Read one of a post's counts with a strongly consistent read (bypasses post_cache)"""
+        item = db_connection.get_item_raw(
+            'posts',
+            {'post_id': post_id},
+            ConsistentRead=True,
+            ProjectionExpression=count_attribute
+        )
+        return int((item or {}).get(count_attribute, 0))
+    
     def update_counts(self, likes_delta: int = 0, comments_delta: int = 0) -> bool:
         """Update like and comment counts"""
         try:
@@ -394,15 +473,21 @@ class Post(BaseModel):
                 ':comments_delta': comments_delta
             }
             
-            table.update_item(
+            response = table.update_item(
                 Key={'post_id': self.post_id},
                 UpdateExpression=update_expression,
-                ExpressionAttributeValues=expression_attribute_values
+                ExpressionAttributeValues=expression_attribute_values,
+                ReturnValues='UPDATED_NEW'
             )
             
-            # Update instance attributes
-            self.likes_count += likes_delta
-            self.comments_count += comments_delta
+            # Update instance attributes from the stored counts (includes concurrent updates)
+            attributes = response.get('Attributes', {})
+            self.likes_count = attributes.get('likes_count', self.likes_count + likes_delta)
+            self.comments_count = attributes.get('comments_count', self.comments_count + comments_delta)
+            
+            # Write the stored counts through to the cached post
+            counts = {'likes_count': self.likes_count, 'comments_count': self.comments_count}
+            post_cache.update(self.post_id, lambda item: dict(item, **counts))
             
             logger.info(f"Post {self.post_id} counts updated successfully")
             return True
@@ -416,6 +501,7 @@ class Post(BaseModel):
         try:
             table = self.db.get_table('posts')
             table.delete_item(Key={'post_id': self.post_id})
+            post_cache.invalidate(self.post_id)
             logger.info(f"Post {self.post_id} deleted successfully")
             return True
             
@@ -439,6 +525,15 @@ class Post(BaseModel):
 class Interaction(BaseModel):
     """Interaction model for DynamoDB Interactions table (likes and comments)"""
     
+    __slots__ = ('post_id', 'user_id', 'interaction_type', 'content', 'created_at', 'interaction_id')
+    
+    # Post attribute counting each interaction type
+    COUNT_ATTRIBUTES = {'like': 'likes_count', 'comment': 'comments_count'}
+    
+    # Likes stored before like_id() was introduced are keyed like#{user_id}#{timestamp};
+    # they are still looked up until scripts/migrate_legacy_likes.py has rewritten them
+    LEGACY_LIKE_LOOKUP = os.getenv('LEGACY_LIKE_LOOKUP', 'true').lower() == 'true'
+    
     def __init__(self, post_id: str = None, user_id: str = None, 
                  interaction_type: str = None, content: str = None):
         super().__init__()
@@ -447,27 +542,62 @@ class Interaction(BaseModel):
         self.interaction_type = interaction_type  # 'like' or 'comment'
         self.content = content  # Only for comments
         self.created_at = self._get_timestamp()
-        # Generate composite interaction_id: {type}#{user_id}#{timestamp}
-        self.interaction_id = f"{interaction_type}#{user_id}#{self.created_at}"
+        # Generate composite interaction_id: like#{user_id} (one per user and post) or
+        # {type}#{timestamp}#{user_id}, so the sort key orders comments by creation time
+        if interaction_type == 'like':
+            self.interaction_id = self.like_id(user_id)
+        else:
+            self.interaction_id = f"{interaction_type}#{self.created_at}#{user_id}"
     
-    def save(self) -> bool:
-        """Save interaction to DynamoDB"""
+    @classmethod
+    def _from_item(cls, item: Dict[str, Any]) -> 'Interaction':
+        """Build an interaction from a DynamoDB item (skips __init__, which would generate an ID and timestamp)"""
+        interaction = cls.__new__(cls)
+        interaction.post_id = item['post_id']
+        interaction.user_id = item['user_id']
+        interaction.interaction_type = item['interaction_type']
+        interaction.content = item.get('content')
+        interaction.created_at = item['created_at']
+        interaction.interaction_id = item['interaction_id']
+        return interaction
+    
+    @staticmethod
+    def like_id(user_id: str) -> str:
+        """Deterministic interaction_id for a user's like, so a post can only hold one per user"""
+        return f"like#{user_id}"
+    
+    def save(self, only_if_new: bool = False) -> bool:
+        """
+        Save interaction to DynamoDB
+        
+        With only_if_new, the write is conditional on the key not existing yet and
+        False is returned (nothing written) if it already does.
+        """
         try:
-            table = self.db.get_table('interactions')
-            
+            # Item is built directly in AttributeValue format for the low-level client
+            # (skips the Resource layer's per-attribute TypeSerializer pass)
             item = {
-                'post_id': self.post_id,
-                'interaction_id': self.interaction_id,
-                'user_id': self.user_id,
-                'interaction_type': self.interaction_type,
-                'created_at': self.created_at
+                'post_id': {'S': self.post_id},
+                'interaction_id': {'S': self.interaction_id},
+                'user_id': {'S': self.user_id},
+                'interaction_type': {'S': self.interaction_type},
+                'created_at': {'S': self.created_at}
             }
             
             # Add content for comments
             if self.content:
-                item['content'] = self.content
-            
-            table.put_item(Item=item)
+                item['content'] = {'S': self.content}
+            
+            put_params = {'TableName': self.db.table_names['interactions'], 'Item': item}
+            if only_if_new:
+                try:
+                    self.db.client.put_item(**put_params, ConditionExpression='attribute_not_exists(interaction_id)')
+                except ClientError as e:
+                    if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                        return False
+                    raise
+            else:
+                self.db.client.put_item(**put_params)
             logger.info(f"Interaction {self.interaction_id} saved successfully")
             return True
             
@@ -475,6 +605,67 @@ class Interaction(BaseModel):
             logger.error(f"Failed to save interaction {self.interaction_id}: {e}")
             raise
     
+    def save_with_count(self, only_if_new: bool = False) -> Optional[int]:
+        """
+        Save interaction and increment the post's like/comment count in one transaction
+        
+        Returns the post's stored count after the write. With only_if_new, None is returned
+        (nothing written) if the interaction already exists.
+        """
+        put_params = {'Item': self.to_dict()}
+        if only_if_new:
+            put_params['ConditionExpression'] = 'attribute_not_exists(interaction_id)'
+        return self._write_with_count(('Put', 'interactions', put_params), 1)
+    
+    def delete_with_count(self) -> Optional[int]:
+        """
+        Delete interaction and decrement the post's like/comment count in one transaction
+        
+        Returns the post's stored count after the write, or None (nothing written) if the
+        interaction does not exist.
+        """
+        delete_params = {
+            'Key': {
+                'post_id': self.post_id,
+                'interaction_id': self.interaction_id
+            },
+            'ConditionExpression': 'attribute_exists(interaction_id)'
+        }
+        return self._write_with_count(('Delete', 'interactions', delete_params), -1)
+    
+    def _write_with_count(self, operation, delta: int) -> Optional[int]:
+        """Apply an interaction write together with the matching post counter update"""
+        count_attribute = self.COUNT_ATTRIBUTES[self.interaction_type]
+        count_update = ('Update', 'posts', {
+            'Key': {'post_id': self.post_id},
+            'UpdateExpression': f"ADD {count_attribute} :delta",
+            'ConditionExpression': 'attribute_exists(post_id)',
+            'ExpressionAttributeValues': {':delta': delta}
+        })
+        try:
+            try:
+                self.db.transact_write_raw([operation, count_update])
+            except ClientError as e:
+                # The first cancellation reason belongs to the interaction write
+                reasons = e.response.get('CancellationReasons') or [{}]
+                if (e.response['Error']['Code'] == 'TransactionCanceledException'
+                        and reasons[0].get('Code') == 'ConditionalCheckFailed'):
+                    return None
+                raise
+            
+            # Transactions return no attributes, so read the stored count back (it includes
+            # writes from other processes that the cached post has not seen)
+            count = Post.get_stored_count(self.post_id, count_attribute)
+            
+            # Write the new count through to the cached post instead of dropping it
+            post_cache.update(self.post_id, lambda item: dict(item, **{count_attribute: count}))
+            logger.info(f"Interaction {self.interaction_id} written with post count delta {delta}")
+            return count
+            
+        except Exception as e:
+            logger.error(f"Failed to write interaction {self.interaction_id}: {e}")
+            raise
+    
     @classmethod
     def get_post_interactions(cls, post_id: str, interaction_type: str = None, 
                             limit: int = 50) -> List['Interaction']:
@@ -488,81 +679,113 @@ class Interaction(BaseModel):
                 'Limit': limit
             }
             
-            # Filter by interaction type if specified
+            # Narrow to one interaction type via its sort key prefix (returned in sort key order,
+            # i.e. oldest first for comments)
             if interaction_type:
-                query_params['FilterExpression'] = 'interaction_type = :type'
-                query_params['ExpressionAttributeValues'][':type'] = interaction_type
+                query_params['KeyConditionExpression'] = (
+                    'post_id = :post_id AND interaction_id BETWEEN :type_lo AND :type_hi'
+                )
+                query_params['ExpressionAttributeValues'][':type_lo'] = f'{interaction_type}#'
+                query_params['ExpressionAttributeValues'][':type_hi'] = f'{interaction_type}#~'
+                query_params['ScanIndexForward'] = True
             
             response = table.query(**query_params)
             
-            interactions = []
-            for item in response['Items']:
-                interaction = cls(
-                    post_id=item['post_id'],
-                    user_id=item['user_id'],
-                    interaction_type=item['interaction_type'],
-                    content=item.get('content')
-                )
-                interaction.interaction_id = item['interaction_id']
-                interaction.created_at = item['created_at']
-                interactions.append(interaction)
-            
-            return interactions
+            return [cls._from_item(item) for item in response['Items']]
             
         except Exception as e:
             logger.error(f"Failed to get interactions for post {post_id}: {e}")
             raise
     
+    @classmethod
+    def get_by_id(cls, post_id: str, interaction_id: str) -> Optional['Interaction']:
+        """Get a single interaction by its primary key"""
+        try:
+            table = db_connection.get_table('interactions')
+            response = table.get_item(
+                Key={
+                    'post_id': post_id,
+                    'interaction_id': interaction_id
+                }
+            )
+            
+            if 'Item' in response:
+                return cls._from_item(response['Item'])
+            
+            return None
+            
+        except Exception as e:
+            logger.error(f"Failed to get interaction {interaction_id} for post {post_id}: {e}")
+            raise
+    
     @classmethod
     def get_user_like(cls, post_id: str, user_id: str) -> Optional['Interaction']:
         """Check if user has liked a post"""
         try:
             table = db_connection.get_table('interactions')
             
-            # Query for like interaction with specific pattern
-            response = table.query(
-                KeyConditionExpression='post_id = :post_id AND begins_with(interaction_id, :like_prefix)',
-                ExpressionAttributeValues={
-                    ':post_id': post_id,
-                    ':like_prefix': f'like#{user_id}#'
-                },
-                Limit=1
+            # Likes have a deterministic key, so this is a point read
+            response = table.get_item(
+                Key={
+                    'post_id': post_id,
+                    'interaction_id': cls.like_id(user_id)
+                }
             )
             
-            if response['Items']:
-                item = response['Items'][0]
-                interaction = cls(
-                    post_id=item['post_id'],
-                    user_id=item['user_id'],
-                    interaction_type=item['interaction_type']
-                )
-                interaction.interaction_id = item['interaction_id']
-                interaction.created_at = item['created_at']
-                return interaction
+            if 'Item' in response:
+                return cls._from_item(response['Item'])
             
-            return None
+            legacy_likes = cls.get_legacy_likes(post_id, user_id)
+            return legacy_likes[0] if legacy_likes else None
             
         except Exception as e:
             logger.error(f"Failed to get user like for post {post_id}, user {user_id}: {e}")
             raise
     
     @classmethod
-    def delete_like(cls, post_id: str, user_id: str) -> bool:
-        """Delete a like interaction"""
+    def get_legacy_likes(cls, post_id: str, user_id: str) -> List['Interaction']:
+        """Get a user's likes on a post stored under the old timestamped key (empty once migrated)"""
+        if not cls.LEGACY_LIKE_LOOKUP:
+            return []
+        
         try:
-            # First find the like
-            like = cls.get_user_like(post_id, user_id)
-            if not like:
-                return False
-            
             table = db_connection.get_table('interactions')
-            table.delete_item(
-                Key={
-                    'post_id': post_id,
-                    'interaction_id': like.interaction_id
+            response = table.query(
+                KeyConditionExpression='post_id = :post_id AND begins_with(interaction_id, :prefix)',
+                ExpressionAttributeValues={
+                    ':post_id': post_id,
+                    ':prefix': f"{cls.like_id(user_id)}#"
                 }
             )
             
+            return [cls._from_item(item) for item in response['Items']]
+            
+        except Exception as e:
+            logger.error(f"Failed to get legacy likes for post {post_id}, user {user_id}: {e}")
+            raise
+    
+    @classmethod
+    def delete_like(cls, post_id: str, user_id: str) -> bool:
+        """Delete a like interaction (returns False if there was no like to delete)"""
+        try:
+            table = db_connection.get_table('interactions')
+            try:
+                table.delete_item(
+                    Key={
+                        'post_id': post_id,
+                        'interaction_id': cls.like_id(user_id)
+                    },
+                    ConditionExpression='attribute_exists(interaction_id)'
+                )
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                legacy_likes = cls.get_legacy_likes(post_id, user_id)
+                if not legacy_likes:
+                    return False
+                for legacy_like in legacy_likes:
+                    legacy_like.delete()
+            
             logger.info(f"Like deleted for post {post_id}, user {user_id}")
             return True
             
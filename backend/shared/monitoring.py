@@ -5,11 +5,13 @@ Comprehensive monitoring utilities for photo sharing app
 import os
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Dict, Any, Optional, Callable
 from functools import wraps
 from contextlib import contextmanager
 
 from .logging_config import get_logger
+from .cache import TTLCache
 from .xray_config import xray_config, monitoring, trace_function, time_function
 from .cloudwatch_config import cloudwatch_config, monitor_api_request, monitor_database_operation
 from .dynamodb_optimizer import dynamodb_optimizer
@@ -23,6 +25,12 @@ class HealthCheck:
     def __init__(self):
         self.checks = {}
         self.environment = os.getenv('ENVIRONMENT', 'development')
+        # Checks run concurrently so /health takes as long as the slowest probe; the pool
+        # grows with the registered checks so every check has a worker of its own
+        self._max_workers = 4
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='health-check')
+        # Results are reused briefly so frequent /health polling doesn't re-run every probe
+        self._results_cache = TTLCache(maxsize=1, ttl=float(os.getenv('HEALTH_CHECK_CACHE_TTL', '5')))
     
     def register_check(self, name: str, check_func: Callable[[], bool], 
                       timeout: int = 5, critical: bool = True):
@@ -32,10 +40,19 @@ class HealthCheck:
             'timeout': timeout,
             'critical': critical
         }
+        if len(self.checks) > self._max_workers:
+            # Workers still running a previous probe finish on the old pool
+            self._executor.shutdown(wait=False)
+            self._max_workers = max(4, len(self.checks))
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='health-check')
         logger.info(f"Registered health check: {name}")
     
     def run_checks(self) -> Dict[str, Any]:
         """Run all health checks"""
+        cached = self._results_cache.get('results')
+        if cached is not None:
+            return cached
+        
         results = {
             'status': 'healthy',
             'timestamp': time.time(),
@@ -45,8 +62,15 @@ class HealthCheck:
         
         overall_healthy = True
         
+        # Start every probe first, then collect each one within its own timeout
+        started_at = time.time()
+        futures = {
+            name: self._executor.submit(check_config['func'])
+            for name, check_config in self.checks.items()
+        }
+        
         for name, check_config in self.checks.items():
-            check_result = self._run_single_check(name, check_config)
+            check_result = self._run_single_check(name, check_config, futures[name], started_at)
             results['checks'][name] = check_result
             
             if check_config['critical'] and not check_result['healthy']:
@@ -65,11 +89,15 @@ class HealthCheck:
             'status': results['status']
         })
         
+        self._results_cache.set('results', results)
         return results
     
-    def _run_single_check(self, name: str, check_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Run a single health check"""
-        start_time = time.time()
+    def _run_single_check(self, name: str, check_config: Dict[str, Any],
+                          future=None, started_at: float = None) -> Dict[str, Any]:
+        """Run a single health check, or wait for one already submitted to the executor"""
+        start_time = started_at or time.time()
+        if future is None:
+            future = self._executor.submit(check_config['func'])
         result = {
             'healthy': False,
             'duration_ms': 0,
@@ -78,8 +106,14 @@ class HealthCheck:
         
         try:
             with xray_config.create_subsegment(f"HealthCheck.{name}"):
-                # Run the check with timeout
-                healthy = check_config['func']()
+                # Wait for the check with timeout (a hung probe keeps its worker thread,
+                # but no longer holds up the response)
+                remaining = max(0, check_config['timeout'] - (time.time() - start_time))
+                try:
+                    healthy = future.result(timeout=remaining)
+                except FutureTimeoutError:
+                    future.cancel()
+                    raise TimeoutError(f"Health check timed out after {check_config['timeout']}s")
                 result['healthy'] = bool(healthy)
                 
                 xray_config.add_annotation('check_name', name)
@@ -157,9 +191,14 @@ def setup_database_health_checks():
         try:
             from .dynamodb import db_connection
             
-            # Try to get a table (this will test connectivity)
-            table = db_connection.get_table('users')
-            table.load()  # This will raise an exception if table doesn't exist or can't connect
+            # Read a key that never exists: a data-plane call that fails if the table is
+            # missing or unreachable, without DescribeTable's account-wide rate limit.
+            # The probe client's own 2s timeouts keep a hung call from holding its worker.
+            db_connection.get_probe_client().get_item(
+                TableName=db_connection.table_names['users'],
+                Key={'user_id': {'S': '__healthcheck__'}},
+                ProjectionExpression='user_id'
+            )
             return True
             
         except Exception as e:
@@ -114,6 +114,14 @@ class PostService:
             result = Post.get_timeline_posts(limit=limit, last_key=parsed_last_key)
             posts = result['posts']
             
+            # Load all authors with one BatchGetItem; _enrich_post_data then reads them from the
+            # user cache (if this fails, enrichment falls back to one lookup per post)
+            if posts:
+                try:
+                    Post.hydrate_authors(posts)
+                except Exception as e:
+                    logger.warning(f"Failed to prefetch timeline post authors: {e}")
+            
             # Enrich posts with user data and image URLs
             enriched_posts = []
             for post in posts:
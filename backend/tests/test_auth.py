@@ -23,6 +23,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app import app
 from shared.auth import AuthService, auth_service
 from shared.models import User
+from shared.cache import user_item_cache
 from shared.error_handler import ValidationError, AuthenticationError, DuplicateError
 
 
@@ -375,6 +376,7 @@ class TestDynamoDBMockOperations(unittest.TestCase):
             'email': 'test@example.com',
             'password': 'testpassword123'
         }
+        user_item_cache.clear()
     
     @patch('shared.dynamodb.db_connection.get_table')
     def test_user_save_dynamodb_success(self, mock_get_table):
@@ -0,0 +1,74 @@
+"""
+Tests for in-process caching utilities
+"""
+import pytest
+import os
+import sys
+from unittest.mock import patch
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.cache import TTLCache
+
+class TestTTLCache:
+    """Test cases for TTLCache"""
+
+    def test_get_returns_stored_value(self):
+        """Test that a stored value is returned before it expires"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set('user-1', {'username': 'alice'})
+
+        assert cache.get('user-1') == {'username': 'alice'}
+        assert cache.get('user-2') is None
+
+    def test_entries_expire_after_ttl(self):
+        """Test that expired entries are treated as missing"""
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        with patch('shared.cache.time.monotonic', return_value=100.0):
+            cache.set('user-1', 'alice')
+
+        with patch('shared.cache.time.monotonic', return_value=159.0):
+            assert cache.get('user-1') == 'alice'
+
+        with patch('shared.cache.time.monotonic', return_value=160.0):
+            assert cache.get('user-1') is None
+            assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test LRU eviction when the cache is full"""
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get_many(['a', 'b', 'c']) == {'a': 1, 'c': 3}
+
+    def test_invalidate_removes_entry(self):
+        """Test that invalidate drops a single entry"""
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.invalidate('a')
+        cache.invalidate('missing')
+
+        assert cache.get_many(['a', 'b']) == {'b': 2}
+
+    def test_update_replaces_value_and_keeps_expiry(self):
+        """Test that update rewrites an entry in place without extending its TTL"""
+        cache = TTLCache(maxsize=10, ttl=60)
+
+        with patch('shared.cache.time.monotonic', return_value=100.0):
+            cache.set('post-1', {'likes_count': 1})
+
+        with patch('shared.cache.time.monotonic', return_value=150.0):
+            cache.update('post-1', lambda post: dict(post, likes_count=post['likes_count'] + 1))
+            cache.update('missing', lambda post: post)
+            assert cache.get('post-1') == {'likes_count': 2}
+            assert cache.get('missing') is None
+
+        with patch('shared.cache.time.monotonic', return_value=160.0):
+            assert cache.get('post-1') is None
+
+if __name__ == '__main__':
+    pytest.main([__file__])
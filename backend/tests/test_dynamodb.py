@@ -0,0 +1,70 @@
+"""
+Tests for DynamoDB connection utilities
+"""
+import pytest
+import os
+import sys
+from unittest.mock import patch
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import botocore
+from botocore import parsers
+
+from shared.dynamodb import db_connection, install_orjson_response_parser
+
+# Response bodies as DynamoDB sends them, plus the edge cases orjson hands back to botocore
+RESPONSE_BODIES = [
+    b'',
+    b'{"Items":[{"post_id":{"S":"p1"},"likes_count":{"N":"12"},'
+    b'"caption":{"S":"caf\\u00e9 \\ud83d\\udcf7"},"tags":{"L":[{"S":"a"},{"NULL":true}]}}],'
+    b'"Count":1,"ScannedCount":1,"LastEvaluatedKey":{"post_id":{"S":"p1"}}}',
+    b'{"ConsumedCapacity":{"TableName":"posts","CapacityUnits":0.5}}',
+    b'{"__type":"com.amazonaws.dynamodb.v20120810#ConditionalCheckFailedException",'
+    b'"message":"The conditional request failed"}',
+    b'{"big":123456789012345678901234567890,"low":-9223372036854775809}',
+    b'{"huge":1e400}',
+    b'{"surrogate":"\\ud800"}',
+    b'<html>Service Unavailable</html>',
+]
+
+class TestOrjsonResponseParser:
+    """Test cases for the opt-in orjson response parser"""
+
+    @pytest.mark.parametrize('body', RESPONSE_BODIES)
+    def test_parsed_output_matches_stock_parser(self, body):
+        """Test that orjson parsing returns exactly what botocore's own parser returns"""
+        pytest.importorskip('orjson')
+        parser = parsers.create_parser('json')
+        stock_parse = parsers.BaseJSONParser._parse_body_as_json
+        expected = stock_parse(parser, body)
+
+        # patch.object restores the stock parser when the test ends
+        with patch.object(parsers.BaseJSONParser, '_parse_body_as_json', stock_parse):
+            assert install_orjson_response_parser() is True
+            assert parsers.BaseJSONParser._parse_body_as_json.uses_orjson
+            assert parser._parse_body_as_json(body) == expected
+
+    def test_not_installed_on_unsupported_botocore(self):
+        """Test that the parser is left alone on botocore versions it was not checked against"""
+        pytest.importorskip('orjson')
+        stock_parse = parsers.BaseJSONParser._parse_body_as_json
+
+        with patch.object(parsers.BaseJSONParser, '_parse_body_as_json', stock_parse), \
+                patch.object(botocore, '__version__', '1.30.0'):
+            assert install_orjson_response_parser() is False
+            assert parsers.BaseJSONParser._parse_body_as_json is stock_parse
+
+class TestProbeClient:
+    """Test cases for the health check client"""
+
+    def test_probe_client_fails_fast(self):
+        """Test that health probes use short socket timeouts and no retries"""
+        client = db_connection.get_probe_client()
+
+        assert client.meta.config.connect_timeout == 2
+        assert client.meta.config.read_timeout == 2
+        assert client.meta.config.retries['total_max_attempts'] == 1
+        assert db_connection.get_probe_client() is client
+
+if __name__ == '__main__':
+    pytest.main([__file__])
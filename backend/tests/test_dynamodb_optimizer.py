@@ -0,0 +1,129 @@
+"""
+Tests for DynamoDB query optimizer
+"""
+import pytest
+import os
+import sys
+import time
+import zlib
+from unittest.mock import patch, MagicMock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.dynamodb_optimizer import dynamodb_optimizer
+
+def make_posts(count):
+    """Create post items whose scan (key) order differs from created_at order"""
+    return [
+        {'post_id': f"post-{i:03d}", 'user_id': 'user-1', 'image_key': f"images/{i}.jpg",
+         'created_at': f"2024-01-01T00:{(i * 37) % count:02d}:00"}
+        for i in range(count)
+    ]
+
+class FakePostsTable:
+    """In-memory stand-in for paginated Scan (single and segmented)"""
+
+    def __init__(self, items):
+        self.items = sorted(items, key=lambda item: item['post_id'])
+
+    def scan(self, Limit, ExclusiveStartKey=None, Segment=None, TotalSegments=None, **kwargs):
+        items = self.items
+        if TotalSegments:
+            items = [item for item in items
+                     if zlib.crc32(item['post_id'].encode()) % TotalSegments == Segment]
+        if ExclusiveStartKey:
+            items = [item for item in items if item['post_id'] > ExclusiveStartKey['post_id']]
+        page = items[:Limit]
+        response = {'Items': [dict(item) for item in page]}
+        if len(items) > Limit:
+            response['LastEvaluatedKey'] = {'post_id': page[-1]['post_id']}
+        return response
+
+    def scan_raw(self, table_type, **kwargs):
+        return self.scan(**kwargs)
+
+def read_all_pages(limit):
+    """Page through the timeline until has_more is False, returning pages of post_ids"""
+    pages = []
+    last_key = None
+    while True:
+        result = dynamodb_optimizer.optimize_timeline_query(limit=limit, last_key=last_key)
+        pages.append([item['post_id'] for item in result['posts']])
+        if not result['has_more']:
+            return pages
+        last_key = result['last_evaluated_key']
+        assert len(pages) < 100
+
+class TestTimelineScanPagination:
+    """Test cases for the scan-based timeline (used until the timeline index is enabled)"""
+
+    @pytest.mark.parametrize('segments', [1, 3])
+    def test_no_post_is_skipped_across_pages(self, segments):
+        """Test that paging through the scan returns every post exactly once"""
+        posts = make_posts(47)
+        table = FakePostsTable(posts)
+
+        with patch.object(dynamodb_optimizer, 'timeline_index_enabled', False), \
+                patch.object(dynamodb_optimizer, 'fallback_scan_segments', segments), \
+                patch.object(dynamodb_optimizer, '_posts', table), \
+                patch.object(dynamodb_optimizer.db, 'scan_raw', table.scan_raw):
+            pages = read_all_pages(limit=10)
+
+        returned = [post_id for page in pages for post_id in page]
+        assert sorted(returned) == sorted(post['post_id'] for post in posts)
+        assert all(len(page) <= 10 for page in pages)
+
+class FakeInteractionsTable:
+    """In-memory stand-in for paginated Query that counts the pages fetched"""
+
+    def __init__(self, count):
+        self.items = [{'post_id': 'post-1', 'interaction_id': f"like#user-{i:03d}"}
+                      for i in range(count)]
+        self.pages = 0
+
+    def query_raw(self, table_type, Limit, ExclusiveStartKey=None, **kwargs):
+        self.pages += 1
+        start = int(ExclusiveStartKey['index']) + 1 if ExclusiveStartKey else 0
+        page = self.items[start:start + min(Limit, 5)]
+        response = {'Items': page}
+        if start + len(page) < len(self.items):
+            response['LastEvaluatedKey'] = {'index': start + len(page) - 1}
+        return response
+
+class TestIterInteractions:
+    """Test cases for the lazily paged interaction query"""
+
+    def test_latency_excludes_consumer_time(self):
+        """Test that only the page fetches are timed, not the time the caller spends per item"""
+        table = FakeInteractionsTable(12)
+        record_operation = MagicMock()
+
+        with patch.object(dynamodb_optimizer.db, 'query_raw', table.query_raw), \
+                patch.object(dynamodb_optimizer, '_record_query_metrics') as record_metrics, \
+                patch('shared.cloudwatch_config.cloudwatch_config.record_database_operation',
+                      record_operation):
+            for _ in dynamodb_optimizer.iter_interactions('post-1', limit=10):
+                time.sleep(0.02)
+
+        query_type, query_time, count = record_metrics.call_args.args
+        assert count == 10
+        assert query_time < 0.1
+        assert table.pages == 2
+        assert record_operation.call_count == 2
+        assert all(call.args[2] < 100 for call in record_operation.call_args_list)
+
+    def test_stopping_early_fetches_no_more_pages(self):
+        """Test that a caller that stops after the first page never fetches the second"""
+        table = FakeInteractionsTable(12)
+
+        with patch.object(dynamodb_optimizer.db, 'query_raw', table.query_raw), \
+                patch.object(dynamodb_optimizer, '_record_query_metrics') as record_metrics:
+            interactions = dynamodb_optimizer.iter_interactions('post-1', limit=10)
+            first = [next(interactions) for _ in range(3)]
+            interactions.close()
+
+        assert [item['interaction_id'] for item in first] == ['like#user-000', 'like#user-001', 'like#user-002']
+        assert table.pages == 1
+        assert record_metrics.call_args.args[2] == 3
+
+if __name__ == '__main__':
+    pytest.main([__file__])
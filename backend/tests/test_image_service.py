@@ -5,6 +5,7 @@ import pytest
 import os
 import io
 from PIL import Image
+from flask import Flask
 from unittest.mock import Mock, patch, MagicMock, call
 from botocore.exceptions import ClientError, NoCredentialsError
 import sys
@@ -134,6 +135,36 @@ class TestImageService:
             assert img.format == 'JPEG'
             assert img.mode == 'RGB'
     
+    def test_validate_and_process(self):
+        """Test combined validation and processing of an upload"""
+        image_data = self.create_test_image('JPEG', size=(1000, 1000))
+        
+        validation, processed = self.image_service.validate_and_process(
+            file_data=image_data,
+            filename='test.jpg',
+            content_type='image/jpeg'
+        )
+        
+        assert validation['valid'] is True
+        assert validation['dimensions'] == {'width': 1000, 'height': 1000}
+        assert set(processed) == {'original', 'medium', 'thumbnail'}
+        assert Image.open(io.BytesIO(processed['original'])).size == (1000, 1000)
+    
+    def test_validate_and_process_rejects_corrupted_data(self):
+        """Test combined validation rejects truncated image data"""
+        image_data = self.create_test_image('JPEG', size=(200, 200))[:200]
+        
+        # ValidationError reads flask.g when constructed, so raise it inside an app context
+        with Flask(__name__).app_context():
+            with pytest.raises(ValidationError) as exc_info:
+                self.image_service.validate_and_process(
+                    file_data=image_data,
+                    filename='test.jpg',
+                    content_type='image/jpeg'
+                )
+        
+        assert "無効な画像ファイルです" in str(exc_info.value)
+    
     @patch('boto3.client')
     def test_generate_upload_url(self, mock_boto_client):
         """Test S3 upload URL generation"""
@@ -482,6 +513,23 @@ class TestImageService:
             ExpiresIn=7200
         )
     
+    @patch('boto3.client')
+    def test_get_image_url_reuses_cached_url(self, mock_boto_client):
+        """Test that default-expiry URLs are presigned once and dropped on delete"""
+        mock_s3 = Mock()
+        mock_boto_client.return_value = mock_s3
+        mock_s3.generate_presigned_url.return_value = 'https://image-url.com'
+        
+        service = ImageService()
+        
+        assert service.get_image_url('test/image.jpg') == 'https://image-url.com'
+        assert service.get_image_url('test/image.jpg') == 'https://image-url.com'
+        assert mock_s3.generate_presigned_url.call_count == 1
+        
+        service.delete_image('test/image.jpg')
+        service.get_image_url('test/image.jpg')
+        assert mock_s3.generate_presigned_url.call_count == 2
+    
     @patch('boto3.client')
     def test_ensure_bucket_exists_creation(self, mock_boto_client):
         """Test bucket creation when bucket doesn't exist"""
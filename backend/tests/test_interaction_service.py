@@ -5,6 +5,7 @@ import pytest
 import sys
 import os
 from decimal import Decimal
+from unittest.mock import patch
 
 # Add the backend directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -109,6 +110,28 @@ class TestInteractionService:
         like = Interaction.get_user_like(self.post.post_id, self.user1.user_id)
         assert like is None
     
+    def test_toggle_like_removes_legacy_like(self):
+        """Test that a like stored under the old timestamped key is unliked, not liked twice"""
+        legacy_like = Interaction(
+            post_id=self.post.post_id,
+            user_id=self.user1.user_id,
+            interaction_type='like'
+        )
+        legacy_like.interaction_id = f"like#{self.user1.user_id}#{legacy_like.created_at}"
+        legacy_like.save()
+        self.post.update_counts(likes_delta=1)
+        
+        assert interaction_service.get_user_like_status(self.user1.user_id, self.post.post_id) is True
+        
+        result = interaction_service.toggle_like(
+            user_id=self.user1.user_id,
+            post_id=self.post.post_id
+        )
+        
+        assert result['liked'] is False
+        assert int(result['likes_count']) == 0
+        assert Interaction.get_user_like(self.post.post_id, self.user1.user_id) is None
+    
     def test_toggle_like_nonexistent_post(self):
         """Test toggling like on non-existent post"""
         with pytest.raises(NotFoundError) as exc_info:
@@ -600,5 +623,87 @@ class TestInteractionService:
         likes = interaction_service.get_post_likes(self.post.post_id)
         assert int(likes['likes_count']) == 1
 
+class TestStoredCounts:
+    """Test cases for counts returned after like/comment writes"""
+    
+    def test_toggle_like_returns_stored_count_not_cached_count(self):
+        """Test that the response carries the count read back after the write"""
+        # The cached post is behind writes made by other processes
+        post = Post(user_id='user-2', image_key='test/image.jpg', likes_count=2)
+        
+        with patch.object(Post, 'get_by_id', return_value=post), \
+                patch.object(Interaction, 'get_legacy_likes', return_value=[]), \
+                patch.object(db_connection, 'transact_write_raw') as mock_transact, \
+                patch.object(db_connection, 'get_item_raw', return_value={'likes_count': Decimal(7)}) as mock_get:
+            result = interaction_service.toggle_like(user_id='user-1', post_id=post.post_id)
+        
+        assert result['liked'] is True
+        assert result['likes_count'] == 7
+        mock_transact.assert_called_once()
+        assert mock_get.call_args[1]['ConsistentRead'] is True
+    
+    def test_add_comment_returns_stored_count(self):
+        """Test that add_comment returns the stored comment count"""
+        post = Post(user_id='user-2', image_key='test/image.jpg', comments_count=0)
+        
+        with patch.object(Post, 'get_by_id', return_value=post), \
+                patch.object(User, 'get_profile_summary', return_value={'user_id': 'user-1', 'username': 'alice'}), \
+                patch.object(db_connection, 'transact_write_raw'), \
+                patch.object(db_connection, 'get_item_raw', return_value={'comments_count': Decimal(5)}):
+            result = interaction_service.add_comment(user_id='user-1', post_id=post.post_id, content='hello')
+        
+        assert result['comments_count'] == 5
+
+class TestLegacyCommentOrdering:
+    """Test cases for comments stored under the old comment#{user_id}#{timestamp} key"""
+    
+    # Sort key order: legacy ids sort by user_id, new ids by timestamp
+    ITEMS = [
+        {'post_id': 'post-1', 'interaction_id': 'comment#2024-01-01T00:02:00#aaa', 'user_id': 'aaa',
+         'interaction_type': 'comment', 'content': 'third', 'created_at': '2024-01-01T00:02:00'},
+        {'post_id': 'post-1', 'interaction_id': 'comment#aaa#2024-01-01T00:03:00', 'user_id': 'aaa',
+         'interaction_type': 'comment', 'content': 'fourth', 'created_at': '2024-01-01T00:03:00'},
+        {'post_id': 'post-1', 'interaction_id': 'comment#bbb#2024-01-01T00:00:00', 'user_id': 'bbb',
+         'interaction_type': 'comment', 'content': 'first', 'created_at': '2024-01-01T00:00:00'},
+        {'post_id': 'post-1', 'interaction_id': 'comment#ccc#2024-01-01T00:01:00', 'user_id': 'ccc',
+         'interaction_type': 'comment', 'content': 'second', 'created_at': '2024-01-01T00:01:00'},
+    ]
+    
+    def test_get_post_comments_orders_mixed_ids_by_time(self):
+        """Test that legacy and new comment ids are returned oldest first"""
+        post = Post(user_id='aaa', image_key='test/image.jpg')
+        comments = [Interaction._from_item(item) for item in self.ITEMS]
+        users = {user_id: {'user_id': user_id, 'username': user_id} for user_id in ('aaa', 'bbb', 'ccc')}
+        
+        with patch.object(Post, 'get_by_id', return_value=post), \
+                patch.object(Interaction, 'get_post_interactions', return_value=comments), \
+                patch.object(User, 'batch_get_by_ids', return_value=users):
+            result = interaction_service.get_post_comments('post-1')
+        
+        assert [comment['content'] for comment in result['comments']] == ['first', 'second', 'third', 'fourth']
+    
+    def test_migration_moves_only_legacy_comments(self):
+        """Test that the migration rewrites legacy ids and leaves new ids alone"""
+        from scripts.migrate_legacy_comments import migrate_legacy_comments
+        
+        with patch.object(db_connection, 'get_table') as mock_get_table, \
+                patch.object(db_connection, 'transact_write_raw') as mock_transact:
+            mock_get_table.return_value.scan.return_value = {'Items': [dict(item) for item in self.ITEMS]}
+            
+            assert migrate_legacy_comments(dry_run=True) == {'scanned': 4, 'moved': 3, 'gone': 0}
+            mock_transact.assert_not_called()
+            
+            assert migrate_legacy_comments() == {'scanned': 4, 'moved': 3, 'gone': 0}
+        
+        moved = {
+            call_args[0][0][1][2]['Key']['interaction_id']: call_args[0][0][0][2]['Item']['interaction_id']
+            for call_args in mock_transact.call_args_list
+        }
+        assert moved == {
+            'comment#aaa#2024-01-01T00:03:00': 'comment#2024-01-01T00:03:00#aaa',
+            'comment#bbb#2024-01-01T00:00:00': 'comment#2024-01-01T00:00:00#bbb',
+            'comment#ccc#2024-01-01T00:01:00': 'comment#2024-01-01T00:01:00#ccc',
+        }
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
\ No newline at end of file
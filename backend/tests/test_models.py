@@ -0,0 +1,80 @@
+"""
+Tests for DynamoDB models
+"""
+import pytest
+import os
+import sys
+from unittest.mock import patch, MagicMock
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.models import User
+from shared.cache import user_item_cache
+
+USER_ITEM = {
+    'user_id': 'test-user-id',
+    'username': 'testuser',
+    'email': 'test@example.com',
+    'password_hash': 'hashed_password',
+    'profile_image': 'profiles/test-user-id.jpg',
+    'bio': 'hello',
+    'created_at': '2023-01-01T00:00:00'
+}
+
+class TestUserLookups:
+    """Test cases for the username/email lookups used by login"""
+
+    @pytest.mark.parametrize('lookup, value', [
+        (User.get_by_username, 'testuser'),
+        (User.get_by_email, 'test@example.com'),
+    ])
+    def test_lookup_returns_full_profile(self, lookup, value):
+        """Test that a looked-up user's to_dict carries every profile field"""
+        mock_table = MagicMock()
+        mock_table.query.return_value = {'Items': [dict(USER_ITEM)]}
+
+        with patch('shared.dynamodb.db_connection.get_table', return_value=mock_table):
+            user = lookup(value)
+
+        projection = mock_table.query.call_args.kwargs['ProjectionExpression']
+        assert {name.strip() for name in projection.split(',')} >= set(USER_ITEM)
+        user_data = user.to_dict()
+        assert user_data['bio'] == 'hello'
+        assert user_data['profile_image'] == 'profiles/test-user-id.jpg'
+
+class TestUserCache:
+    """Test cases for the in-process user item cache"""
+
+    def setup_method(self):
+        """Start every test with a cold cache"""
+        user_item_cache.clear()
+
+    def test_user_get_by_id_cached(self):
+        """Test repeated user retrieval is served from cache until the user is updated"""
+        mock_table = MagicMock()
+        mock_table.get_item.return_value = {'Item': dict(USER_ITEM)}
+
+        with patch('shared.dynamodb.db_connection.get_table', return_value=mock_table):
+            user = User.get_by_id('test-user-id')
+            assert User.get_by_id('test-user-id').username == 'testuser'
+            mock_table.get_item.assert_called_once()
+
+            user.update(bio='updated')
+            User.get_by_id('test-user-id')
+            assert mock_table.get_item.call_count == 2
+
+    def test_user_get_many(self):
+        """Test users are fetched in one batch and served from cache afterwards"""
+        with patch('shared.dynamodb_optimizer.dynamodb_optimizer.batch_get_items',
+                   return_value=[dict(USER_ITEM)]) as mock_batch_get_items:
+            users = User.get_many(['test-user-id', 'test-user-id', 'missing-id'])
+
+        mock_batch_get_items.assert_called_once_with('users', 'user_id', ['test-user-id', 'missing-id'])
+        assert list(users) == ['test-user-id']
+        assert users['test-user-id'].username == 'testuser'
+
+        with patch('shared.dynamodb.db_connection.get_table') as mock_get_table:
+            assert User.get_by_id('test-user-id').email == 'test@example.com'
+            mock_get_table.assert_not_called()
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,47 @@
+"""
+Tests for monitoring utilities
+"""
+import pytest
+import os
+import sys
+import threading
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from shared.monitoring import HealthCheck
+
+class TestHealthCheck:
+    """Test cases for HealthCheck"""
+
+    def test_hung_checks_do_not_starve_other_checks(self):
+        """Test that each registered check gets a worker even while others hang"""
+        release = threading.Event()
+        health_checker = HealthCheck()
+
+        for i in range(5):
+            health_checker.register_check(f"hung-{i}", lambda: release.wait(5), timeout=0.3, critical=False)
+        health_checker.register_check('dynamodb', lambda: True, timeout=0.3)
+
+        try:
+            results = health_checker.run_checks()
+        finally:
+            release.set()
+
+        assert results['checks']['dynamodb']['healthy'] is True
+        assert results['status'] == 'healthy'
+        for i in range(5):
+            assert results['checks'][f"hung-{i}"]['healthy'] is False
+            assert 'timed out' in results['checks'][f"hung-{i}"]['error']
+
+    def test_failing_critical_check_marks_unhealthy(self):
+        """Test that a failing critical check makes the overall status unhealthy"""
+        health_checker = HealthCheck()
+        health_checker.register_check('dynamodb', lambda: False)
+        health_checker.register_check('optional', lambda: True, critical=False)
+
+        results = health_checker.run_checks()
+
+        assert results['status'] == 'unhealthy'
+        assert results['checks']['optional']['healthy'] is True
+
+if __name__ == '__main__':
+    pytest.main([__file__])